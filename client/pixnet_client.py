@@ -8,15 +8,74 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import socket
 import struct
+import sys
 import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 import zlib
+import numpy as np
 from PIL import Image, ImageTk
 import io
+import logging
 from typing import Dict, Tuple, Optional, List
 from dataclasses import dataclass
 from enum import IntEnum
 
+try:
+    import lz4.frame
+except ImportError:  # LZ4 support is optional
+    lz4 = None
+
+logger = logging.getLogger('PIXNETClient')
+
+# Capability flags exchanged in the handshake
+CAP_COMPRESSION = 0x01  # zlib
+CAP_LZ4 = 0x10
+CLIENT_CAPABILITIES = CAP_COMPRESSION | (CAP_LZ4 if lz4 else 0)
+
+# Frame header flags
+FLAG_COMPRESSED = 0x01
+FLAG_LZ4 = 0x02  # With FLAG_COMPRESSED: pixel data is an LZ4 frame instead of zlib
+
+# Socket read size used while inflating compressed pixel data
+RECV_CHUNK_SIZE = 64 * 1024
+
+# Kernel receive buffer, large enough to hold a multi-MB frame in flight
+RECV_BUFFER_SIZE = 4 << 20
+
+# Ask the kernel to fill the whole buffer per call where supported. This only
+# works on a blocking socket, so timeouts are set with SO_RCVTIMEO/SO_SNDTIMEO
+# rather than settimeout(), which puts the fd in non-blocking mode
+_RECV_FLAGS = getattr(socket, 'MSG_WAITALL', 0)
+SOCKET_TIMEOUT = 10.0
+# A timed-out read on a blocking socket fails with EAGAIN instead of socket.timeout
+_RECV_TIMEOUT = (socket.timeout, BlockingIOError)
+
+def _timeout_opt(seconds: float) -> bytes:
+    """SO_RCVTIMEO/SO_SNDTIMEO value: milliseconds on Windows, a struct timeval elsewhere"""
+    if sys.platform == 'win32':
+        return struct.pack('<I', int(seconds * 1000))
+    return struct.pack('@ll', int(seconds), int(seconds % 1 * 1_000_000))
+
+# Frames that may be received ahead of the parser before the receive thread waits
+PARSE_QUEUE_DEPTH = 2
+
+# Interval between display refreshes, caps rendering at ~60 Hz
+DRAIN_INTERVAL_MS = 16
+
+# Precompiled wire formats
+_HANDSHAKE = struct.Struct('>6sB2H8s')
+_ACK = struct.Struct('>6sB8s2s')
+_BYE = struct.Struct('>6s8sBB')
+_EVENT_HDR = struct.Struct('>6s8sLHBQ2HBBH')  # Up to the event name and payload lengths
+_FRAME_HDR = struct.Struct('>6sBLQHB2HBL')
+_U16 = struct.Struct('>H')
+_CAT_ID_NAME_LEN = struct.Struct('>HB')
+_CAT_BEHAVIOR = struct.Struct('>BBH')
+
+# Category map entries are big-endian uint16 category IDs
+CATEGORY_MAP_DTYPE = np.dtype('>u2')
+
 class BehaviorType(IntEnum):
     NONE = 0
     NAVIGATE = 1
@@ -29,7 +88,9 @@ class BehaviorType(IntEnum):
     SCROLL_ZONE = 8
     MEDIA_ZONE = 9
 
-@dataclass
+_BEHAVIOR_NAMES = {bt.value: bt.name for bt in BehaviorType}
+
+@dataclass(slots=True)
 class Category:
     id: int
     name: str
@@ -37,15 +98,47 @@ class Category:
     priority: int
     behavior_data: bytes
 
-@dataclass
+@dataclass(slots=True)
 class FrameData:
     sequence: int
     timestamp: int
     width: int
     height: int
-    pixels: bytes
+    pixels: np.ndarray  # RGBA8 as a (height, width, 4) uint8 array
     categories: Dict[int, Category]
     category_map: bytes
+    category_arr: Optional[np.ndarray] = None  # category_map as a (height, width) array
+    category_counts: Optional[np.ndarray] = None  # Pixel count per category ID
+
+@dataclass(slots=True)
+class RawFrame:
+    """A frame as read off the socket, before its categories are decoded"""
+    sequence: int
+    timestamp: int
+    width: int
+    height: int
+    pixels: bytearray
+    category_map: bytearray
+    category_data: bytearray
+
+class _LZ4Inflater:
+    """zlib decompressobj-style wrapper around an LZ4 frame decompressor"""
+    unconsumed_tail = b''  # LZ4 keeps unread input internally
+    
+    def __init__(self):
+        self._decompressor = lz4.frame.LZ4FrameDecompressor()
+    
+    @property
+    def eof(self) -> bool:
+        return self._decompressor.eof
+    
+    @property
+    def unused_data(self) -> bytes:
+        return self._decompressor.unused_data
+    
+    def decompress(self, data, max_length: int = 0) -> bytes:
+        # Output is not capped; the caller checks it against the frame size
+        return self._decompressor.decompress(data)
 
 class PIXNETClient:
     def __init__(self):
@@ -54,30 +147,40 @@ class PIXNETClient:
         self.connected = False
         self.current_frame = None
         self.sequence_counter = 0
+        self._unread = bytearray()  # Bytes received ahead of the field being parsed
+        self._inflate_view = memoryview(bytearray(RECV_CHUNK_SIZE))  # Socket reads fed to zlib
         
     def connect(self, host: str, port: int = 7621) -> bool:
         """Connect to PIXNET server and perform handshake"""
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.settimeout(10.0)
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Events are small
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECV_BUFFER_SIZE)  # Before connect, to size the window
+            self.socket.settimeout(SOCKET_TIMEOUT)
             self.socket.connect((host, port))
             
+            # Back to blocking so MSG_WAITALL takes effect, with the timeout kept in the kernel
+            self.socket.settimeout(None)
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, _timeout_opt(SOCKET_TIMEOUT))
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, _timeout_opt(SOCKET_TIMEOUT))
+            self._unread.clear()
+            
             # Send handshake
-            handshake = struct.pack('>6sB2H8s',
+            handshake = _HANDSHAKE.pack(
                 b'PIXHND',  # Magic
                 1,          # Version
-                0x01,       # Capabilities (compression)
+                CLIENT_CAPABILITIES, # Capabilities
                 10,         # User-agent length
                 b'PyPixnet\x00\x00'  # User-agent (padded)
             )
-            self.socket.send(handshake)
+            self.socket.sendall(handshake)
             
             # Receive acknowledgment
             response = self.socket.recv(17)
             if len(response) < 17:
                 return False
                 
-            magic, version, session_id, server_caps = struct.unpack('>6sB8s2s', response)
+            magic, version, session_id, server_caps = _ACK.unpack(response)
             
             if magic != b'PIXACK':
                 return False
@@ -87,7 +190,7 @@ class PIXNETClient:
             return True
             
         except Exception as e:
-            print(f"Connection failed: {e}")
+            logger.error("Connection failed: %s", e)
             return False
     
     def disconnect(self):
@@ -96,13 +199,13 @@ class PIXNETClient:
             try:
                 # Send termination message
                 if self.session_id:
-                    goodbye = struct.pack('>6s8sBB',
+                    goodbye = _BYE.pack(
                         b'PIXBYE',
                         self.session_id,
                         0,  # Reason code
                         0   # Reason length
                     )
-                    self.socket.send(goodbye)
+                    self.socket.sendall(goodbye)
                 self.socket.close()
             except:
                 pass
@@ -119,10 +222,14 @@ class PIXNETClient:
             
         try:
             self.sequence_counter += 1
-            timestamp = int(time.time() * 1000000)  # microseconds
+            timestamp = time.time_ns() // 1000  # microseconds
             
             event_name_bytes = event_name.encode('ascii')
-            message = struct.pack('>6s8sLHBQ2HB',
+            name_end = _EVENT_HDR.size + len(event_name_bytes)
+            
+            # Assemble the whole event in one buffer so it goes out in one call
+            message = bytearray(name_end + len(payload))
+            _EVENT_HDR.pack_into(message, 0,
                 b'PIXEVT',           # Magic
                 self.session_id,     # Session ID
                 self.sequence_counter, # Sequence
@@ -131,168 +238,263 @@ class PIXNETClient:
                 timestamp,           # Timestamp
                 mouse_x,             # Mouse X
                 mouse_y,             # Mouse Y
-                0                    # Modifier keys
+                0,                   # Modifier keys
+                len(event_name_bytes), # Event name length
+                len(payload)         # Payload length
             )
+            message[_EVENT_HDR.size:name_end] = event_name_bytes
+            message[name_end:] = payload
             
-            message += struct.pack('>BH',
-                len(event_name_bytes),
-                len(payload)
-            )
-            message += event_name_bytes + payload
-            
-            self.socket.send(message)
+            self.socket.sendall(message)
             
         except Exception as e:
-            print(f"Failed to send event: {e}")
+            logger.error("Failed to send event: %s", e)
     
     def receive_frame(self) -> Optional[FrameData]:
         """Receive and parse a frame from server"""
+        raw = self.receive_raw_frame()
+        return self.parse_frame(raw) if raw else None
+    
+    def receive_raw_frame(self) -> Optional[RawFrame]:
+        """Receive a frame from server without decoding its categories"""
         if not self.connected:
             return None
             
         try:
             # Read frame header - let's calculate the correct size
             # Magic(6) + FrameType(1) + Sequence(4) + Timestamp(8) + Flags(2) + Version(1) + Width(2) + Height(2) + Format(1) + Checksum(4) = 31 bytes
-            header_data = self._recv_exact(31)
+            header_data = self._recv_exact(_FRAME_HDR.size)
             if not header_data:
                 return None
                 
-            print(f"Received header: {len(header_data)} bytes")
-            
             # Unpack header fields according to protocol spec
             # Format: Magic(6) + FrameType(1) + Sequence(4) + Timestamp(8) + Flags(2) + Version(1) + Width(2) + Height(2) + Format(1) + Checksum(4)
-            header = struct.unpack('>6sBLQHB2HB4s', header_data)
-            magic, frame_type, sequence, timestamp, flags, version, width, height, format_type, checksum_bytes = header
+            header = _FRAME_HDR.unpack(header_data)
+            magic, frame_type, sequence, timestamp, flags, version, width, height, format_type, checksum = header
             
             if magic != b'PIXNET':
-                print(f"Invalid frame magic: {magic}")
+                logger.warning("Invalid frame magic: %r", magic)
                 return None
                 
-            print(f"Frame: {width}x{height}, type={frame_type}, seq={sequence}")
-            
-            checksum = struct.unpack('>L', checksum_bytes)[0]
+            logger.debug("Frame: %dx%d, type=%d, seq=%d", width, height, frame_type, sequence)
             
             # Calculate pixel data size
             bytes_per_pixel = 4 if format_type == 0 else 4  # RGBA8
             pixel_data_size = width * height * bytes_per_pixel
             category_map_size = width * height * 2
             
-            print(f"Expecting {pixel_data_size} pixel bytes, {category_map_size} category bytes")
-            
-            # Read pixel data
-            pixel_data = self._recv_exact(pixel_data_size)
+            # Read pixel data, inflating it straight off the socket if compressed
+            if flags & FLAG_COMPRESSED:
+                if flags & FLAG_LZ4:
+                    if not lz4:
+                        logger.warning("Received LZ4 frame but lz4 is not installed")
+                        return None
+                    inflater = _LZ4Inflater()
+                else:
+                    inflater = zlib.decompressobj()
+                pixel_data = self._recv_decompressed(pixel_data_size, inflater)
+            else:
+                pixel_data = self._recv_exact(pixel_data_size)
             if not pixel_data:
-                print("Failed to receive pixel data")
+                logger.warning("Failed to receive pixel data")
                 return None
-                
-            # Decompress if needed
-            if flags & 0x01:  # Compression flag
-                print("Decompressing pixel data")
-                pixel_data = zlib.decompress(pixel_data)
             
             # Read category map
             category_map = self._recv_exact(category_map_size)
             if not category_map:
-                print("Failed to receive category map")
+                logger.warning("Failed to receive category map")
                 return None
             
             # Read category definitions
-            categories = self._read_categories()
-            print(f"Received {len(categories)} categories")
+            category_data = self._recv_category_block()
+            if category_data is None:
+                logger.warning("Failed to receive category definitions")
+                return None
             
-            return FrameData(
+            return RawFrame(
                 sequence=sequence,
                 timestamp=timestamp,
                 width=width,
                 height=height,
                 pixels=pixel_data,
-                categories=categories,
-                category_map=category_map
+                category_map=category_map,
+                category_data=category_data
             )
             
         except struct.error as e:
-            print(f"Struct unpack error: {e}")
-            print(f"Header data length: {len(header_data) if 'header_data' in locals() else 'unknown'}")
+            logger.error("Struct unpack error: %s", e)
+            logger.error("Header data length: %s", len(header_data) if 'header_data' in locals() else 'unknown')
+            return None
+        except Exception as e:
+            logger.error("Failed to receive frame: %s", e)
             return None
+    
+    def parse_frame(self, raw: RawFrame) -> Optional[FrameData]:
+        """Decode the categories of a received frame and build its FrameData"""
+        try:
+            categories = self._parse_categories(raw.category_data)
+            logger.debug("Received %d categories", len(categories))
+            
+            category_arr = np.frombuffer(raw.category_map, dtype=CATEGORY_MAP_DTYPE).reshape(
+                raw.height, raw.width)
+            
+            return FrameData(
+                sequence=raw.sequence,
+                timestamp=raw.timestamp,
+                width=raw.width,
+                height=raw.height,
+                pixels=np.frombuffer(raw.pixels, dtype=np.uint8).reshape(raw.height, raw.width, 4),
+                categories=categories,
+                category_map=raw.category_map,
+                category_arr=category_arr,
+                category_counts=np.bincount(category_arr.ravel())
+            )
+            
         except Exception as e:
-            print(f"Failed to receive frame: {e}")
+            logger.error("Failed to parse frame: %s", e)
             return None
     
-    def _recv_exact(self, size: int) -> Optional[bytes]:
-        """Receive exactly 'size' bytes from socket"""
-        data = b''
-        while len(data) < size:
+    def _recv_exact(self, size: int) -> Optional[bytearray]:
+        """Receive exactly 'size' bytes from socket into a preallocated buffer"""
+        buf = bytearray(size)
+        view = memoryview(buf)
+        received = self._take_unread(view)
+        while received < size:
             try:
-                chunk = self.socket.recv(size - len(data))
-                if not chunk:
-                    print(f"Socket closed while expecting {size} bytes, got {len(data)}")
+                got = self.socket.recv_into(view[received:], size - received, _RECV_FLAGS)
+                if not got:
+                    logger.warning("Socket closed while expecting %d bytes, got %d", size, received)
                     return None
-                data += chunk
-            except socket.timeout:
-                print(f"Timeout while receiving {size} bytes, got {len(data)}")
+                received += got
+            except _RECV_TIMEOUT:
+                logger.debug("Timeout while receiving %d bytes, got %d", size, received)
                 return None
             except Exception as e:
-                print(f"Error receiving {size} bytes: {e}")
+                logger.error("Error receiving %d bytes: %s", size, e)
+                return None
+        return buf
+    
+    def _recv_decompressed(self, size: int, inflater) -> Optional[bytearray]:
+        """Receive a compressed stream and inflate it into a 'size' byte buffer"""
+        buf = bytearray(size)
+        view = memoryview(buf)
+        chunk_view = self._inflate_view
+        pos = 0
+        
+        while not inflater.eof:
+            got = self._take_unread(chunk_view)
+            if not got:
+                try:
+                    got = self.socket.recv_into(chunk_view)
+                except _RECV_TIMEOUT:
+                    logger.debug("Timeout while receiving compressed data, inflated %d of %d bytes", pos, size)
+                    return None
+                if not got:
+                    logger.warning("Socket closed while receiving compressed data, inflated %d of %d bytes", pos, size)
+                    return None
+            
+            data = chunk_view[:got]
+            while data and not inflater.eof:
+                remaining = size - pos
+                # Once the buffer is full only the stream trailer may be left
+                out = inflater.decompress(data, remaining) if remaining else inflater.decompress(data)
+                if len(out) > remaining:
+                    logger.warning("Compressed data inflates past the expected %d bytes", size)
+                    return None
+                view[pos:pos + len(out)] = out
+                pos += len(out)
+                data = inflater.unconsumed_tail
+        
+        # Whatever followed the compressed stream belongs to the next field
+        self._unread[:0] = inflater.unused_data
+        
+        if pos != size:
+            logger.warning("Compressed data inflated to %d bytes, expected %d", pos, size)
+            return None
+        return buf
+    
+    def _take_unread(self, view: memoryview) -> int:
+        """Move previously over-read bytes into 'view', returning the count"""
+        count = min(len(self._unread), len(view))
+        if count:
+            view[:count] = self._unread[:count]
+            del self._unread[:count]
+        return count
+    
+    def _recv_category_block(self) -> Optional[bytearray]:
+        """Receive the category definitions block from socket without decoding it"""
+        buf = self._unread
+        if not self._fill_unread(2):
+            return None
+        
+        count = _U16.unpack_from(buf, 0)[0]
+        off = 2
+        
+        # Walk the length fields only: ID(2) + NameLength(1) + Name + BehaviorID(1) + Priority(1) + BehaviorDataLength(2) + BehaviorData
+        for _ in range(count):
+            if not self._fill_unread(off + _CAT_ID_NAME_LEN.size):
+                return None
+            name_len = buf[off + 2]
+            off += _CAT_ID_NAME_LEN.size + name_len
+            
+            if not self._fill_unread(off + _CAT_BEHAVIOR.size):
                 return None
-        return data
+            data_len = _CAT_BEHAVIOR.unpack_from(buf, off)[2]
+            off += _CAT_BEHAVIOR.size + data_len
+        
+        if not self._fill_unread(off):
+            return None
+        
+        # Keep anything read past the definitions for the next frame
+        block = buf[:off]
+        del buf[:off]
+        return block
     
-    def _read_categories(self) -> Dict[int, Category]:
-        """Read category definitions from socket"""
+    def _parse_categories(self, block: bytearray) -> Dict[int, Category]:
+        """Decode a category definitions block"""
         categories = {}
-        try:
-            count_data = self._recv_exact(2)
-            if not count_data:
-                return categories
-                
-            count = struct.unpack('>H', count_data)[0]
-            
-            for _ in range(count):
-                # Read category header: ID(2) + NameLength(1) + Name + BehaviorID(1) + Priority(1) + BehaviorDataLength(2) + BehaviorData
-                cat_id_data = self._recv_exact(2)
-                if not cat_id_data:
-                    break
-                cat_id = struct.unpack('>H', cat_id_data)[0]
-                
-                name_len_data = self._recv_exact(1)
-                if not name_len_data:
-                    break
-                name_len = struct.unpack('>B', name_len_data)[0]
-                
-                # Read category name
-                name_data = self._recv_exact(name_len)
-                if not name_data:
-                    break
-                name = name_data.decode('ascii')
-                
-                # Read behavior ID and priority
-                behavior_data = self._recv_exact(2)
-                if not behavior_data:
-                    break
-                behavior_id, priority = struct.unpack('>BB', behavior_data)
-                
-                # Read behavior data length
-                data_len_data = self._recv_exact(2)
-                if not data_len_data:
-                    break
-                data_len = struct.unpack('>H', data_len_data)[0]
-                
-                # Read behavior data
-                behavior_data = self._recv_exact(data_len)
-                if not behavior_data:
-                    break
-                
-                categories[cat_id] = Category(
-                    id=cat_id,
-                    name=name,
-                    behavior_id=behavior_id,
-                    priority=priority,
-                    behavior_data=behavior_data
-                )
-                
-        except Exception as e:
-            print(f"Failed to read categories: {e}")
+        count = _U16.unpack_from(block, 0)[0]
+        off = 2
+        
+        for _ in range(count):
+            cat_id, name_len = _CAT_ID_NAME_LEN.unpack_from(block, off)
+            off += _CAT_ID_NAME_LEN.size
+            
+            name = sys.intern(block[off:off + name_len].decode('ascii'))  # Shared across frames
+            off += name_len
+            
+            behavior_id, priority, data_len = _CAT_BEHAVIOR.unpack_from(block, off)
+            off += _CAT_BEHAVIOR.size
+            
+            behavior_data = bytes(block[off:off + data_len])
+            off += data_len
             
+            categories[cat_id] = Category(
+                id=cat_id,
+                name=name,
+                behavior_id=behavior_id,
+                priority=priority,
+                behavior_data=behavior_data
+            )
+        
         return categories
+    
+    def _fill_unread(self, size: int) -> bool:
+        """Read ahead from the socket until at least 'size' bytes are buffered"""
+        while len(self._unread) < size:
+            try:
+                chunk = self.socket.recv(max(RECV_CHUNK_SIZE, size - len(self._unread)))
+                if not chunk:
+                    logger.warning("Socket closed while expecting %d bytes, got %d", size, len(self._unread))
+                    return False
+                self._unread += chunk
+            except _RECV_TIMEOUT:
+                logger.debug("Timeout while receiving %d bytes, got %d", size, len(self._unread))
+                return False
+            except Exception as e:
+                logger.error("Error receiving %d bytes: %s", size, e)
+                return False
+        return True
 
 class PIXNETClientGUI:
     def __init__(self):
@@ -304,7 +506,23 @@ class PIXNETClientGUI:
         self.receive_thread = None
         self.running = False
         
+        # Category decoding runs here so the receive thread can read the next frame
+        self.parse_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pixnet-parse")
+        self._parse_slots = threading.BoundedSemaphore(PARSE_QUEUE_DEPTH)
+        
+        # Canvas item and photo reused across frames
+        self._image_item = None
+        self._photo = None
+        
+        # Categories currently listed in the info panel
+        self._last_cat_sig = None
+        
+        # Latest parsed frame not yet rendered; older ones are dropped
+        self._pending_lock = threading.Lock()
+        self._pending_frame = None
+        
         self.setup_ui()
+        self.root.after(DRAIN_INTERVAL_MS, self._drain)
         
     def setup_ui(self):
         """Setup the user interface"""
@@ -350,7 +568,12 @@ class PIXNETClientGUI:
         info_frame = ttk.LabelFrame(main_frame, text="Information")
         info_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=(5, 0))
         
-        # Frame info
+        # Frame info, refreshed every frame
+        self.frame_info_var = tk.StringVar()
+        ttk.Label(info_frame, textvariable=self.frame_info_var, justify=tk.LEFT).pack(
+            side=tk.TOP, anchor=tk.W, padx=5, pady=(5, 0))
+        
+        # Category list, rebuilt only when the categories change
         self.info_text = tk.Text(info_frame, width=30, height=15, wrap=tk.WORD)
         info_scroll = ttk.Scrollbar(info_frame, orient=tk.VERTICAL, command=self.info_text.yview)
         self.info_text.configure(yscrollcommand=info_scroll.set)
@@ -407,26 +630,53 @@ class PIXNETClientGUI:
         self.disconnect_btn.config(state=tk.DISABLED)
         
         self.canvas.delete("all")
+        self._image_item = None
+        self._photo = None
+        self.frame_info_var.set("")
         self.info_text.delete(1.0, tk.END)
+        self._last_cat_sig = None
+        
+        # A frame parsed just before disconnecting must not be drawn on the cleared canvas
+        with self._pending_lock:
+            self._pending_frame = None
     
     def receive_loop(self):
         """Background thread for receiving frames"""
         while self.running and self.client.connected:
             try:
-                frame = self.client.receive_frame()
-                if frame:
-                    self.root.after(0, self.update_display, frame)
+                raw = self.client.receive_raw_frame()
+                if raw:
+                    self._parse_slots.acquire()  # Wait while the parser is behind
+                    future = self.parse_pool.submit(self.client.parse_frame, raw)
+                    future.add_done_callback(self._on_frame_parsed)
                 else:
                     time.sleep(0.1)  # Brief pause if no frame received
             except Exception as e:
-                print(f"Error in receive loop: {e}")
+                logger.error("Error in receive loop: %s", e)
                 break
     
+    def _on_frame_parsed(self, future: Future):
+        """Hand a parsed frame over to the Tk thread"""
+        self._parse_slots.release()
+        frame = future.result()
+        if frame:
+            with self._pending_lock:
+                if self.running:  # Checked under the lock so disconnect() cannot race it
+                    self._pending_frame = frame
+    
+    def _drain(self):
+        """Render the most recent pending frame, then reschedule"""
+        with self._pending_lock:
+            frame, self._pending_frame = self._pending_frame, None
+        if frame:
+            self.update_display(frame)
+        self.root.after(DRAIN_INTERVAL_MS, self._drain)
+    
     def update_display(self, frame: FrameData):
         """Update the display with new frame data"""
         try:
-            # Convert pixel data to PIL Image
-            image = Image.frombytes('RGBA', (frame.width, frame.height), frame.pixels)
+            # Wrap pixel data as a PIL Image without copying it
+            image = Image.fromarray(frame.pixels)
             
             # Scale to fit canvas
             canvas_width = self.canvas.winfo_width()
@@ -441,13 +691,23 @@ class PIXNETClientGUI:
                 new_height = int(frame.height * scale)
                 
                 if scale < 1.0:
-                    image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Display image
-            photo = ImageTk.PhotoImage(image)
-            self.canvas.delete("all")
-            self.canvas.create_image(canvas_width//2, canvas_height//2, image=photo, anchor=tk.CENTER)
-            self.canvas.image = photo  # Keep reference
+                    # BOX averages large reductions cheaply; BILINEAR is enough otherwise
+                    resample = Image.Resampling.BOX if scale < 0.5 else Image.Resampling.BILINEAR
+                    image = image.resize((new_width, new_height), resample)
+            
+            # Display image, updating the existing photo in place while its size holds
+            if self._photo and (self._photo.width(), self._photo.height()) == image.size:
+                self._photo.paste(image)
+            else:
+                self._photo = ImageTk.PhotoImage(image)  # Keep reference
+                if self._image_item is not None:
+                    self.canvas.itemconfigure(self._image_item, image=self._photo)
+            
+            if self._image_item is None:
+                self._image_item = self.canvas.create_image(canvas_width//2, canvas_height//2,
+                                                            image=self._photo, anchor=tk.CENTER)
+            else:
+                self.canvas.coords(self._image_item, canvas_width//2, canvas_height//2)
             
             # Store current frame for interaction
             self.client.current_frame = frame
@@ -456,20 +716,33 @@ class PIXNETClientGUI:
             self.update_info_panel(frame)
             
         except Exception as e:
-            print(f"Error updating display: {e}")
+            logger.error("Error updating display: %s", e)
     
     def update_info_panel(self, frame: FrameData):
         """Update the information panel"""
-        self.info_text.delete(1.0, tk.END)
+        self.frame_info_var.set(
+            f"Frame #{frame.sequence}\n"
+            f"Size: {frame.width}x{frame.height}\n"
+            f"Timestamp: {frame.timestamp}"
+        )
+        
+        # Rebuilding the Text widget is expensive, skip it for unchanged categories
+        counts = frame.category_counts
+        sig = (
+            tuple((cat_id, category.name, category.behavior_id) for cat_id, category in frame.categories.items()),
+            counts.tobytes() if counts is not None else None
+        )
+        if sig == self._last_cat_sig:
+            return
+        self._last_cat_sig = sig
         
-        info = f"Frame #{frame.sequence}\n"
-        info += f"Size: {frame.width}x{frame.height}\n"
-        info += f"Timestamp: {frame.timestamp}\n\n"
+        self.info_text.delete(1.0, tk.END)
         
-        info += f"Categories ({len(frame.categories)}):\n"
+        info = f"Categories ({len(frame.categories)}):\n"
         for cat_id, category in frame.categories.items():
-            behavior_name = BehaviorType(category.behavior_id).name
-            info += f"  {cat_id}: {category.name} ({behavior_name})\n"
+            behavior_name = _BEHAVIOR_NAMES.get(category.behavior_id, 'UNKNOWN')
+            pixels = int(counts[cat_id]) if counts is not None and cat_id < len(counts) else 0
+            info += f"  {cat_id}: {category.name} ({behavior_name}, {pixels} px)\n"
         
         self.info_text.insert(1.0, info)
     
@@ -502,19 +775,17 @@ class PIXNETClientGUI:
         
         if 0 <= frame_x < frame.width and 0 <= frame_y < frame.height:
             # Get category at clicked position
-            category_index = (frame_y * frame.width + frame_x) * 2
-            if category_index < len(frame.category_map):
-                category_id = struct.unpack('>H', frame.category_map[category_index:category_index+2])[0]
+            category_id = int(frame.category_arr[frame_y, frame_x])
+            
+            if category_id in frame.categories:
+                category = frame.categories[category_id]
+                logger.debug("Clicked category %d: %s", category_id, category.name)
                 
-                if category_id in frame.categories:
-                    category = frame.categories[category_id]
-                    print(f"Clicked category {category_id}: {category.name}")
-                    
-                    # Send appropriate event based on behavior
-                    if category.behavior_id == BehaviorType.EMIT_EVENT:
-                        self.client.send_event(category_id, 0, "click", frame_x, frame_y)
-                    elif category.behavior_id == BehaviorType.NAVIGATE:
-                        self.client.send_event(category_id, 0, "navigate", frame_x, frame_y)
+                # Send appropriate event based on behavior
+                if category.behavior_id == BehaviorType.EMIT_EVENT:
+                    self.client.send_event(category_id, 0, "click", frame_x, frame_y)
+                elif category.behavior_id == BehaviorType.NAVIGATE:
+                    self.client.send_event(category_id, 0, "navigate", frame_x, frame_y)
     
     def on_canvas_motion(self, event):
         """Handle canvas motion events for hover effects"""
@@ -543,6 +814,7 @@ class PIXNETClientGUI:
         """Handle application closing"""
         self.running = False
         self.client.disconnect()
+        self.parse_pool.shutdown(wait=False)
         self.root.destroy()
 
 if __name__ == "__main__":
@@ -554,5 +826,6 @@ if __name__ == "__main__":
         print("Install it with: pip install Pillow")
         exit(1)
     
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     client = PIXNETClientGUI()
     client.run()
\ No newline at end of file
@@ -11,19 +11,32 @@ Supports PXNT file format with full protocol features including:
 """
 
 import socket
+import selectors
 import struct
+import sys
 import threading
 import time
 import zlib
 import os
 import glob
-import secrets
+import heapq
+import itertools
 import argparse
 import logging
-from typing import Dict, List, Tuple, Optional, Any, Union
+import mmap
+import numpy as np
+from collections import deque
+from typing import Deque, Dict, List, Tuple, Optional, Any, Union
 from dataclasses import dataclass
+from functools import cached_property
 from enum import IntEnum
 
+try:
+    import lz4.block
+    import lz4.frame
+except ImportError:  # LZ4 support is optional
+    lz4 = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -49,6 +62,57 @@ MAGIC_BYE = b"PIXBYE"
 DEFAULT_PORT = 7621
 PROTOCOL_VERSION = 1
 MAX_SESSION_AGE = 300  # 5 minutes in seconds
+HANDSHAKE_TIMEOUT = 10.0  # Seconds a new connection gets to send its handshake
+RECV_BUFFER_SIZE = 4096  # Initial per-session receive buffer; grows for long input payloads
+SENDMSG_MAX_BUFFERS = 64  # Well under IOV_MAX
+SEND_BUFFER_SIZE = 1 << 20  # Default SO_SNDBUF for client sockets
+
+# Scatter/gather sends hand header and cached payloads to the kernel without joining them
+_HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+# Linux only: hold partial segments back while a frame is being written
+_TCP_CORK = getattr(socket, 'TCP_CORK', None)
+
+# epoll-backed selectors scale far better than a thread per client on Linux
+USE_EPOLL_DEFAULT = sys.platform.startswith('linux')
+
+# Capability flags exchanged in the handshake
+CAP_COMPRESSION = 0x01  # zlib
+CAP_PARTIAL = 0x02
+CAP_ANIMATION = 0x04
+CAP_AUDIO = 0x08
+CAP_LZ4 = 0x10
+SERVER_CAPABILITIES = CAP_COMPRESSION | (CAP_LZ4 if lz4 else 0)
+
+# Frame header flags
+FLAG_COMPRESSED = 0x01
+FLAG_LZ4 = 0x02  # With FLAG_COMPRESSED: pixel data is an LZ4 frame instead of zlib
+
+# Precompiled PXNT file formats (little-endian)
+_U16 = struct.Struct('<H')
+_U32_PAIR = struct.Struct('<II')
+_PXNT_HEADER = struct.Struct('<4sHHIIIIHHBBH')
+_CATEGORY_HEADER = struct.Struct('<HBBHH')
+_AUDIO_HEADER = struct.Struct('<BIBI')
+_SECTION_HEADER = struct.Struct('<BI')
+_PXNT_FOOTER = struct.Struct('<4sIII')
+_EVENT_BEHAVIOR_TAIL = struct.Struct('<BH')
+# Single bytes by value, cheaper than packing one-byte fields
+_BYTE = [bytes((i,)) for i in range(256)]
+
+# Precompiled PIXNET frame header (big-endian); only sequence and timestamp vary per send
+_FRAME_HEADER = struct.Struct('>6sBIQHBHHBI')
+_FRAME_SEQ_TS = struct.Struct('>IQ')
+_FRAME_SEQ_OFFSET = 7  # After magic and frame type
+
+# Precompiled control messages (big-endian)
+_HANDSHAKE_ACK = struct.Struct('>6sB8sH')
+_ERROR_HEADER = struct.Struct('>6sHH')
+
+# Precompiled client message fields (big-endian), unpacked in place after the magic
+_BE_U16 = struct.Struct('>H')
+_EVENT_HEADER = struct.Struct('>8sIHBQ')  # Session ID, sequence, zone, event type, timestamp
+_INPUT_HEADER = struct.Struct('>8sIHBBH')  # Session ID, sequence, zone, input type, validation, payload length
+_MOUSE_POS = struct.Struct('>HH')
 
 # Frame types
 class FrameType(IntEnum):
@@ -77,10 +141,27 @@ class BehaviorType(IntEnum):
     SCROLL_ZONE = 8
     MEDIA_ZONE = 9
 
+def _decompress(data, compression: int, uncompressed_size: int) -> bytes:
+    """Decompress PXNT section data"""
+    if compression == 1:  # zlib
+        return zlib.decompress(data)
+    if compression == 2 and lz4:  # lz4 block, size taken from the section
+        return lz4.block.decompress(data, uncompressed_size=uncompressed_size)
+    raise ValueError(f"Unsupported compression: {compression}")
+
 @dataclass
 class AnimationFrame:
-    pixels: bytes
+    data: bytes  # Frame pixels as stored in the file
     duration: int  # in milliseconds
+    compression: int = 0  # File compression type of data
+    uncompressed_size: int = 0
+    
+    @cached_property
+    def pixels(self) -> bytes:
+        """RGBA8 frame pixels, decompressed on first use"""
+        if self.compression in (1, 2):  # zlib, lz4
+            return _decompress(self.data, self.compression, self.uncompressed_size)
+        return self.data
 
 @dataclass
 class AudioStream:
@@ -89,7 +170,7 @@ class AudioStream:
     channels: int
     data: bytes
 
-@dataclass
+@dataclass(slots=True)
 class Category:
     id: int
     name: str
@@ -104,16 +185,31 @@ class PXNTFile:
         self.filepath = filepath
         self.header = {}
         self.metadata = {}
-        self.pixels = b''
+        self.pixels: Optional[bytes] = b''  # None after finalize()
         self.category_map = b''
+        # Zero-copy NumPy view over the category map, indexed [y, x]
+        self.category_map_np: Optional[np.ndarray] = None
         self.categories: List[Category] = []
         self.animation_frames: List[AnimationFrame] = []
         self.audio_stream: Optional[AudioStream] = None
         self.extended_metadata = {}
         self.loaded = False
         
+        # Wire payloads, computed once per load and shared by every send
+        self.compressed_pixels = b''
+        self.compressed_pixels_lz4: Optional[bytes] = None
+        self.frame_header_template = b''
+        self.frame_header_template_lz4: Optional[bytes] = None
+        self.category_data = b''
+        # Read-only views over the payloads above, handed straight to sendmsg()
+        self.compressed_pixels_view = memoryview(b'')
+        self.compressed_pixels_lz4_view: Optional[memoryview] = None
+        self.category_map_view = memoryview(b'')
+        self.category_data_view = memoryview(b'')
+        
         try:
             self.load_file()
+            self._cache_payloads()
             self.loaded = True
         except Exception as e:
             logger.error(f"Failed to load PXNT file {filepath}: {str(e)}")
@@ -122,47 +218,131 @@ class PXNTFile:
     def load_file(self):
         """Load and parse a PXNT file"""
         with open(self.filepath, 'rb') as f:
-            # Read and validate file header
-            self._parse_header(f)
-            
-            # Read page metadata
-            self._parse_metadata(f)
-            
-            # Read pixel data
-            self._parse_pixel_data(f)
+            if os.fstat(f.fileno()).st_size < _PXNT_HEADER.size:
+                raise ValueError("Invalid PXNT file header length")
             
-            # Read category map
-            self._parse_category_map(f)
-            
-            # Read category definitions
-            self._parse_category_definitions(f)
-            
-            # Read optional sections
-            if self.header.get('flags', 0) & 0x02:  # HAS_ANIMATION
-                self._parse_animation_data(f)
-            
-            if self.header.get('flags', 0) & 0x04:  # HAS_AUDIO
-                self._parse_audio_data(f)
-            
-            if self.header.get('flags', 0) & 0x08:  # HAS_METADATA
-                self._parse_extended_metadata(f)
-            
-            logger.info(f"Loaded PXNT file: {self.filepath}")
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        # Parse straight out of the page cache; every section copies what it keeps.
+        # On errors the traceback still holds slices, so the map is left to the GC.
+        self._parse_sections(memoryview(mm))
+        mm.close()
+        
+        logger.info(f"Loaded PXNT file: {self.filepath}")
     
-    def _parse_header(self, f):
+    def _parse_sections(self, buf: memoryview):
+        """Parse every section of a PXNT file held in buf"""
+        # Read and validate file header
+        off = self._parse_header(buf, 0)
+        self._verify_checksum(buf)
+        
+        # Read page metadata
+        off = self._parse_metadata(buf, off)
+        
+        # Read pixel data
+        off = self._parse_pixel_data(buf, off)
+        
+        # Read category map
+        off = self._parse_category_map(buf, off)
+        
+        # Read category definitions
+        off = self._parse_category_definitions(buf, off)
+        
+        # Read optional sections
+        if self.header.get('flags', 0) & 0x02:  # HAS_ANIMATION
+            off = self._parse_animation_data(buf, off)
+        
+        if self.header.get('flags', 0) & 0x04:  # HAS_AUDIO
+            off = self._parse_audio_data(buf, off)
+        
+        if self.header.get('flags', 0) & 0x08:  # HAS_METADATA
+            off = self._parse_extended_metadata(buf, off)
+    
+    def _cache_payloads(self):
+        """Precompute the compressed pixel payloads sent to clients"""
+        self.compressed_pixels = zlib.compress(self.pixels, 6)
+        self.frame_header_template = self._build_frame_header(FLAG_COMPRESSED, self.compressed_pixels)
+        if lz4:
+            self.compressed_pixels_lz4 = lz4.frame.compress(self.pixels)
+            self.frame_header_template_lz4 = self._build_frame_header(
+                FLAG_COMPRESSED | FLAG_LZ4, self.compressed_pixels_lz4)
+        self.category_data = self._serialize_categories()
+        
+        self.compressed_pixels_view = memoryview(self.compressed_pixels)
+        if self.compressed_pixels_lz4 is not None:
+            self.compressed_pixels_lz4_view = memoryview(self.compressed_pixels_lz4)
+        # The wire is big-endian while the file map is little-endian; swap once here
+        self.category_map_view = memoryview(self.category_map_np.astype('>u2').tobytes())
+        self.category_data_view = memoryview(self.category_data).toreadonly()
+    
+    def _serialize_categories(self) -> bytearray:
+        """Serialize the category definitions in wire format"""
+        records = [(category, category.name.encode('ascii')) for category in self.categories]
+        
+        # Size the buffer up front: count, then ID, name length, name, behavior ID,
+        # priority, behavior data length and behavior data per category
+        total = 2 + sum(7 + len(name_bytes) + len(category.behavior_data)
+                        for category, name_bytes in records)
+        category_data = bytearray(total)
+        _BE_U16.pack_into(category_data, 0, len(records))  # Category count
+        
+        off = 2
+        for category, name_bytes in records:
+            behavior_data = category.behavior_data
+            # Whole record in one pack; struct caches the compiled format per size pair
+            record = f'>HB{len(name_bytes)}sBBH{len(behavior_data)}s'
+            struct.pack_into(
+                record, category_data, off,
+                category.id,           # ID
+                len(name_bytes),       # Name length
+                name_bytes,            # Name
+                category.behavior_id,  # Behavior ID
+                category.priority,     # Priority
+                len(behavior_data),    # Behavior data length
+                behavior_data          # Behavior data
+            )
+            off += 7 + len(name_bytes) + len(behavior_data)
+        
+        return category_data
+    
+    def finalize(self):
+        """Drop the raw pixels once the wire payloads are cached.
+        
+        Serving only needs the compressed payloads and the category map, so
+        this frees width * height * 4 bytes per page.
+        """
+        if not self.compressed_pixels:
+            raise RuntimeError("Cannot finalize PXNT file before caching payloads")
+        self.pixels = None
+    
+    def _build_frame_header(self, flags: int, compressed_pixels: bytes) -> bytes:
+        """Build a frame header with zero sequence and timestamp to patch at send time"""
+        # Calculate checksum (simplified)
+        checksum = len(compressed_pixels) + len(self.category_map)
+        return _FRAME_HEADER.pack(
+            MAGIC_PIXNET,
+            FrameType.FULL,          # Frame type
+            0,                       # Sequence (patched per send)
+            0,                       # Timestamp (patched per send)
+            flags,                   # Flags
+            PROTOCOL_VERSION,        # Version
+            self.header['width'],    # Width
+            self.header['height'],   # Height
+            0,                       # Format (RGBA8)
+            checksum                 # Checksum
+        )
+    
+    def _parse_header(self, buf: memoryview, off: int) -> int:
         """Parse PXNT file header"""
-        header_data = f.read(32)
-        if len(header_data) != 32:
+        if len(buf) - off < _PXNT_HEADER.size:
             raise ValueError("Invalid PXNT file header length")
         
-        magic = header_data[:4]
+        (magic, version, flags, file_size, created, modified, crc32,
+         width, height, pixel_format, compression, reserved) = _PXNT_HEADER.unpack_from(buf, off)
+        
         if magic != b'PXNT':
             raise ValueError("Invalid PXNT file magic number")
         
-        (version, flags, file_size, created, modified, crc32,
-         width, height, pixel_format, compression, reserved) = struct.unpack(
-            '<HHIIIIHHBBH', header_data[4:])
-        
         self.header = {
             'version': version,
             'flags': flags,
@@ -175,40 +355,71 @@ class PXNTFile:
             'pixel_format': pixel_format,
             'compression': compression
         }
+        return off + _PXNT_HEADER.size
+    
+    def _verify_checksum(self, buf: memoryview):
+        """Check the header CRC32 against the data sections"""
+        expected = self.header['crc32']
+        if expected == 0:
+            return  # Written without a checksum
+        
+        end = len(buf)
+        if end >= _PXNT_HEADER.size + _PXNT_FOOTER.size and \
+                buf[end - _PXNT_FOOTER.size:end - _PXNT_FOOTER.size + 4] == b'TNXP':
+            end -= _PXNT_FOOTER.size
+        
+        if zlib.crc32(buf[_PXNT_HEADER.size:end]) != expected:
+            raise ValueError("PXNT file checksum mismatch")
     
-    def _parse_metadata(self, f):
+    def _parse_metadata(self, buf: memoryview, off: int) -> int:
         """Parse page metadata section"""
         # Title
-        title_len = struct.unpack('<H', f.read(2))[0]
-        title = f.read(title_len).decode('utf-8') if title_len > 0 else ""
+        title_len = _U16.unpack_from(buf, off)[0]
+        off += 2
+        title = str(buf[off:off+title_len], 'utf-8') if title_len > 0 else ""
+        off += title_len
         
         # Author
-        author_len = struct.unpack('<B', f.read(1))[0]
-        author = f.read(author_len).decode('utf-8') if author_len > 0 else ""
+        author_len = buf[off]
+        off += 1
+        author = str(buf[off:off+author_len], 'utf-8') if author_len > 0 else ""
+        off += author_len
         
         # Description
-        desc_len = struct.unpack('<H', f.read(2))[0]
-        description = f.read(desc_len).decode('utf-8') if desc_len > 0 else ""
+        desc_len = _U16.unpack_from(buf, off)[0]
+        off += 2
+        description = str(buf[off:off+desc_len], 'utf-8') if desc_len > 0 else ""
+        off += desc_len
         
         # URL
-        url_len = struct.unpack('<H', f.read(2))[0]
-        url = f.read(url_len).decode('utf-8') if url_len > 0 else ""
+        url_len = _U16.unpack_from(buf, off)[0]
+        off += 2
+        url = str(buf[off:off+url_len], 'utf-8') if url_len > 0 else ""
+        off += url_len
         
         # Keywords
-        keyword_count = struct.unpack('<B', f.read(1))[0]
+        keyword_count = buf[off]
+        off += 1
         keywords = []
         for _ in range(keyword_count):
-            kw_len = struct.unpack('<B', f.read(1))[0]
-            keywords.append(f.read(kw_len).decode('utf-8'))
+            kw_len = buf[off]
+            off += 1
+            keywords.append(str(buf[off:off+kw_len], 'utf-8'))
+            off += kw_len
         
         # Custom fields
-        custom_count = struct.unpack('<B', f.read(1))[0]
+        custom_count = buf[off]
+        off += 1
         custom_fields = {}
         for _ in range(custom_count):
-            key_len = struct.unpack('<B', f.read(1))[0]
-            key = f.read(key_len).decode('utf-8')
-            value_len = struct.unpack('<H', f.read(2))[0]
-            value = f.read(value_len).decode('utf-8')
+            key_len = buf[off]
+            off += 1
+            key = str(buf[off:off+key_len], 'utf-8')
+            off += key_len
+            value_len = _U16.unpack_from(buf, off)[0]
+            off += 2
+            value = str(buf[off:off+value_len], 'utf-8')
+            off += value_len
             custom_fields[key] = value
         
         self.metadata = {
@@ -219,8 +430,9 @@ class PXNTFile:
             'keywords': keywords,
             'custom_fields': custom_fields
         }
+        return off
     
-    def _parse_pixel_data(self, f):
+    def _parse_pixel_data(self, buf: memoryview, off: int) -> int:
         """Parse pixel data section"""
         width = self.header['width']
         height = self.header['height']
@@ -232,56 +444,65 @@ class PXNTFile:
         expected_size = width * height * bytes_per_pixel
         
         if compression == 0:  # No compression
-            self.pixels = f.read(expected_size)
+            self.pixels = bytes(buf[off:off+expected_size])
+            off += expected_size
         else:
-            uncompressed_size = struct.unpack('<I', f.read(4))[0]
-            compressed_size = struct.unpack('<I', f.read(4))[0]
-            compressed_data = f.read(compressed_size)
+            uncompressed_size, compressed_size = _U32_PAIR.unpack_from(buf, off)
+            off += _U32_PAIR.size
+            compressed_data = buf[off:off+compressed_size]
+            off += compressed_size
             
-            if compression == 1:  # zlib
-                self.pixels = zlib.decompress(compressed_data)
-            else:
-                raise ValueError(f"Unsupported compression: {compression}")
+            self.pixels = self._decompress(compressed_data, uncompressed_size)
         
         # Convert to RGBA8 if needed
         if pixel_format == 1:  # RGB8 -> RGBA8
-            rgba_pixels = bytearray()
-            for i in range(0, len(self.pixels), 3):
-                rgba_pixels.extend(self.pixels[i:i+3])
-                rgba_pixels.append(255)  # Add alpha
-            self.pixels = bytes(rgba_pixels)
+            rgb = np.frombuffer(self.pixels, dtype=np.uint8).reshape(-1, 3)
+            rgba_pixels = np.empty((len(rgb), 4), dtype=np.uint8)
+            rgba_pixels[:, :3] = rgb
+            rgba_pixels[:, 3] = 255  # Add alpha
+            self.pixels = rgba_pixels.tobytes()
+        
+        return off
+    
+    def _decompress(self, data, uncompressed_size: int) -> bytes:
+        """Decompress section data using the file's compression type"""
+        return _decompress(data, self.header['compression'], uncompressed_size)
     
-    def _parse_category_map(self, f):
+    def _parse_category_map(self, buf: memoryview, off: int) -> int:
         """Parse category map section"""
         width = self.header['width']
         height = self.header['height']
         expected_size = width * height * 2
         
         if self.header['flags'] & 0x01:  # COMPRESSED
-            uncompressed_size = struct.unpack('<I', f.read(4))[0]
-            compressed_size = struct.unpack('<I', f.read(4))[0]
-            compressed_data = f.read(compressed_size)
-            self.category_map = zlib.decompress(compressed_data)
+            uncompressed_size, compressed_size = _U32_PAIR.unpack_from(buf, off)
+            off += _U32_PAIR.size
+            self.category_map = zlib.decompress(buf[off:off+compressed_size])
+            off += compressed_size
         else:
-            self.category_map = f.read(expected_size)
+            self.category_map = bytes(buf[off:off+expected_size])
+            off += expected_size
+        
+        self.category_map_np = np.frombuffer(self.category_map, dtype='<u2').reshape(height, width)
+        return off
     
-    def _parse_category_definitions(self, f):
+    def _parse_category_definitions(self, buf: memoryview, off: int) -> int:
         """Parse category definitions section"""
-        category_count = struct.unpack('<H', f.read(2))[0]
+        category_count = _U16.unpack_from(buf, off)[0]
+        off += 2
         
         for _ in range(category_count):
             # Category header
-            cat_id = struct.unpack('<H', f.read(2))[0]
-            behavior_id = struct.unpack('<B', f.read(1))[0]
-            priority = struct.unpack('<B', f.read(1))[0]
-            name_len = struct.unpack('<H', f.read(2))[0]
-            data_len = struct.unpack('<H', f.read(2))[0]
+            cat_id, behavior_id, priority, name_len, data_len = _CATEGORY_HEADER.unpack_from(buf, off)
+            off += _CATEGORY_HEADER.size
             
             # Category name
-            name = f.read(name_len).decode('utf-8')
+            name = str(buf[off:off+name_len], 'utf-8')
+            off += name_len
             
             # Behavior data
-            behavior_data = f.read(data_len)
+            behavior_data = bytes(buf[off:off+data_len])
+            off += data_len
             
             self.categories.append(Category(
                 id=cat_id,
@@ -290,32 +511,39 @@ class PXNTFile:
                 priority=priority,
                 behavior_data=behavior_data
             ))
+        return off
     
-    def _parse_animation_data(self, f):
+    def _parse_animation_data(self, buf: memoryview, off: int) -> int:
         """Parse animation data section"""
-        frame_count = struct.unpack('<I', f.read(4))[0]
-        base_delay = struct.unpack('<I', f.read(4))[0]  # ms
+        expected_size = self.header['width'] * self.header['height'] * 4  # RGBA8 frames
+        compression = self.header['compression']
+        if compression == 2 and not lz4:
+            raise ValueError(f"Unsupported compression: {compression}")
         
+        frame_count, base_delay = _U32_PAIR.unpack_from(buf, off)  # base delay in ms
+        off += _U32_PAIR.size
+        
+        # Frames stay as stored; each one is decompressed when first used
         for _ in range(frame_count):
-            frame_delay = struct.unpack('<I', f.read(4))[0]
-            frame_size = struct.unpack('<I', f.read(4))[0]
-            frame_data = f.read(frame_size)
-            
-            if self.header['compression'] == 1:  # zlib
-                frame_data = zlib.decompress(frame_data)
+            frame_delay, frame_size = _U32_PAIR.unpack_from(buf, off)
+            off += _U32_PAIR.size
+            frame_data = bytes(buf[off:off+frame_size])
+            off += frame_size
             
             self.animation_frames.append(AnimationFrame(
-                pixels=frame_data,
-                duration=frame_delay if frame_delay > 0 else base_delay
+                data=frame_data,
+                duration=frame_delay if frame_delay > 0 else base_delay,
+                compression=compression,
+                uncompressed_size=expected_size
             ))
+        return off
     
-    def _parse_audio_data(self, f):
+    def _parse_audio_data(self, buf: memoryview, off: int) -> int:
         """Parse audio data section"""
-        format = struct.unpack('<B', f.read(1))[0]
-        sample_rate = struct.unpack('<I', f.read(4))[0]
-        channels = struct.unpack('<B', f.read(1))[0]
-        data_size = struct.unpack('<I', f.read(4))[0]
-        audio_data = f.read(data_size)
+        format, sample_rate, channels, data_size = _AUDIO_HEADER.unpack_from(buf, off)
+        off += _AUDIO_HEADER.size
+        audio_data = bytes(buf[off:off+data_size])
+        off += data_size
         
         self.audio_stream = AudioStream(
             format=format,
@@ -323,18 +551,22 @@ class PXNTFile:
             channels=channels,
             data=audio_data
         )
+        return off
     
-    def _parse_extended_metadata(self, f):
+    def _parse_extended_metadata(self, buf: memoryview, off: int) -> int:
         """Parse extended metadata section"""
-        section_count = struct.unpack('<H', f.read(2))[0]
+        section_count = _U16.unpack_from(buf, off)[0]
+        off += 2
         
         for _ in range(section_count):
-            section_type = struct.unpack('<B', f.read(1))[0]
-            section_size = struct.unpack('<I', f.read(4))[0]
-            section_data = f.read(section_size)
+            section_type, section_size = _SECTION_HEADER.unpack_from(buf, off)
+            off += _SECTION_HEADER.size
+            section_data = bytes(buf[off:off+section_size])
+            off += section_size
             
             # Store raw section data - can be parsed by specific handlers
             self.extended_metadata[section_type] = section_data
+        return off
 
 @dataclass
 class ClientSession:
@@ -347,45 +579,213 @@ class ClientSession:
     input_values: Dict[int, str] = None
     last_activity: float = time.time()
     user_agent: str = "Unknown"
+    capabilities: int = 0  # Client capability flags from the handshake
+    handshake_done: bool = False
+    recv_buf: bytearray = None  # Received bytes; [recv_start:recv_end] is not parsed yet
+    recv_view: memoryview = None
+    recv_start: int = 0
+    recv_end: int = 0
+    outbox: Deque[memoryview] = None  # Output waiting for the socket (event loop only)
+    closed: bool = False
+    expiry_queued: bool = False  # Has an entry in the server's expiry heap
+    corked: bool = False  # TCP_CORK currently set on the socket
     
     def __post_init__(self):
         self.input_values = {}
+        self.recv_buf = bytearray(RECV_BUFFER_SIZE)
+        self.recv_view = memoryview(self.recv_buf)
+        self.outbox = deque()
+    
+    def expires_at(self) -> float:
+        """Time at which the session counts as inactive"""
+        return self.last_activity + (MAX_SESSION_AGE if self.handshake_done else HANDSHAKE_TIMEOUT)
     
     def is_active(self) -> bool:
         """Check if session is still active"""
-        return (time.time() - self.last_activity) < MAX_SESSION_AGE
+        return time.time() < self.expires_at()
     
     def update_activity(self):
         """Update last activity timestamp"""
         self.last_activity = time.time()
 
+class SessionIdPool:
+    """Session IDs carved from batched os.urandom reads.
+    
+    Same CSPRNG bytes as secrets.token_bytes, but one syscall per
+    refill_size bytes instead of one per handshake.
+    """
+    
+    ID_SIZE = 8
+    
+    def __init__(self, refill_size: int = 8192):
+        self.refill_size = refill_size - refill_size % self.ID_SIZE
+        self._buf = b''
+        self._cursor = 0
+        self._lock = threading.Lock()
+    
+    def next(self) -> bytes:
+        """Hand out a fresh, never reused session ID"""
+        with self._lock:
+            if self._cursor + self.ID_SIZE > len(self._buf):
+                self._buf = os.urandom(self.refill_size)
+                self._cursor = 0
+            start = self._cursor
+            self._cursor += self.ID_SIZE
+            return self._buf[start:self._cursor]
+
+class SessionTable:
+    """Handshaken sessions by ID, striped across independently locked shards"""
+    
+    SHARD_COUNT = 16  # Power of two; shards are picked by the low bits of the ID
+    
+    def __init__(self):
+        self._shards: List[Dict[bytes, ClientSession]] = [{} for _ in range(self.SHARD_COUNT)]
+        self._locks = [threading.Lock() for _ in range(self.SHARD_COUNT)]
+    
+    def _index(self, session_id: bytes) -> int:
+        # Session IDs are random, so their first byte spreads evenly
+        return session_id[0] & (self.SHARD_COUNT - 1)
+    
+    def add(self, session: ClientSession):
+        """Register a session under its ID"""
+        i = self._index(session.session_id)
+        with self._locks[i]:
+            self._shards[i][session.session_id] = session
+    
+    def remove(self, session_id: bytes) -> Optional[ClientSession]:
+        """Unregister a session, returning it if it was present"""
+        if not session_id:
+            return None  # Never completed the handshake
+        i = self._index(session_id)
+        with self._locks[i]:
+            return self._shards[i].pop(session_id, None)
+    
+    def values(self) -> List[ClientSession]:
+        """Snapshot of all sessions, taking one shard lock at a time"""
+        sessions = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                sessions.extend(shard.values())
+        return sessions
+    
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+class ServerStats:
+    """Server counters kept per thread and only summed when read.
+    
+    Each thread bumps its own dict, so concurrent handlers never race on
+    (or lose) a shared increment. Exiting threads fold theirs into a total.
+    """
+    
+    FIELDS = ('connections', 'pages_served', 'errors', 'bytes_sent', 'bytes_received')
+    
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._live: Dict[int, Dict[str, int]] = {}
+        self._retired = dict.fromkeys(self.FIELDS, 0)
+    
+    def local(self) -> Dict[str, int]:
+        """The calling thread's counters, registered on first use"""
+        try:
+            return self._local.counters
+        except AttributeError:
+            counters = self._local.counters = dict.fromkeys(self.FIELDS, 0)
+            with self._lock:
+                self._live[threading.get_ident()] = counters
+            return counters
+    
+    def retire(self):
+        """Fold the calling thread's counters into the totals before it exits"""
+        counters = getattr(self._local, 'counters', None)
+        if counters is None:
+            return
+        with self._lock:
+            del self._live[threading.get_ident()]
+            for field, value in counters.items():
+                self._retired[field] += value
+        del self._local.counters
+    
+    def totals(self) -> Dict[str, int]:
+        """Sum of every thread's counters so far"""
+        with self._lock:
+            totals = dict(self._retired)
+            for counters in self._live.values():
+                for field, value in counters.items():
+                    totals[field] += value
+        return totals
+
+def _fill_gradient(pixels: np.ndarray, r, g, b):
+    """Fill an (h, w, 4) RGBA8 array opaquely; channels may be per-row (h, 1) arrays"""
+    pixels[:, :, 0] = r
+    pixels[:, :, 1] = g
+    pixels[:, :, 2] = b
+    pixels[:, :, 3] = 255
+
+def _fill_rect(pixels: np.ndarray, category_map: Optional[np.ndarray], x: int, y: int,
+               w: int, h: int, category_id: int, rgba: Tuple[int, int, int, int]):
+    """Paint a rectangle and tag it in the category map (slicing clips to the page)"""
+    pixels[y:y+h, x:x+w] = rgba
+    if category_map is not None:
+        category_map[y:y+h, x:x+w] = category_id
+
+def _as_view(chunk: Union[bytes, memoryview]) -> memoryview:
+    """Wrap a chunk for sending, reusing views cached on the PXNT file"""
+    return chunk if isinstance(chunk, memoryview) else memoryview(chunk)
+
+def _write_some(sock: socket.socket, buffers: Deque[memoryview]) -> int:
+    """Write the head of a buffer queue in one gathered call, returning bytes sent.
+    
+    Short writes are normal; callers advance the queue with _drop_sent and retry.
+    """
+    if _HAS_SENDMSG:
+        return sock.sendmsg(itertools.islice(buffers, SENDMSG_MAX_BUFFERS))
+    return sock.send(buffers[0])
+
+def _drop_sent(buffers: Deque[memoryview], sent: int):
+    """Remove sent bytes from the front of a buffer queue"""
+    while sent:
+        head = buffers[0]
+        if sent < len(head):
+            buffers[0] = head[sent:]
+            return
+        sent -= len(head)
+        buffers.popleft()
+
 class PixnetServer:
     """PIXNET protocol server with complete feature set"""
     
     def __init__(self, host: str = 'localhost', port: int = DEFAULT_PORT, 
-                 content_dir: str = 'content', max_connections: int = 100):
+                 content_dir: str = 'content', max_connections: int = 100,
+                 use_epoll: bool = USE_EPOLL_DEFAULT, reuse_port: bool = False,
+                 send_buffer_size: int = SEND_BUFFER_SIZE, recv_buffer_size: int = 0):
         self.host = host
         self.port = port
         self.content_dir = content_dir
         self.max_connections = max_connections
-        self.sessions: Dict[bytes, ClientSession] = {}
+        self.use_epoll = use_epoll  # Selector event loop instead of a thread per client
+        self.reuse_port = reuse_port  # Let several server processes share the port
+        self.send_buffer_size = send_buffer_size  # SO_SNDBUF per client, 0 keeps the OS default
+        self.recv_buffer_size = recv_buffer_size  # SO_RCVBUF per client, 0 keeps the OS default
+        self.sessions = SessionTable()
+        self.session_ids = SessionIdPool()
         self.running = False
         self.server_socket = None
+        self.selector: Optional[selectors.BaseSelector] = None
+        self.cleanup_thread: Optional[threading.Thread] = None
+        
+        # Session expiry min-heap of (deadline, tie-breaker, session)
+        self._expiry_heap: List[Tuple[float, int, ClientSession]] = []
+        self._expiry_order = itertools.count()
+        self._expiry_lock = threading.Lock()
+        self._expiry_wakeup = threading.Event()
+        self._expiry_closed = 0  # Entries for closed sessions still in the heap
         self.pxnt_files: Dict[str, PXNTFile] = {}
-        self.stats = {
-            'connections': 0,
-            'pages_served': 0,
-            'errors': 0,
-            'bytes_sent': 0,
-            'bytes_received': 0
-        }
+        self.stats = ServerStats()
         
         # Initialize content
         self._initialize_content()
-        
-        # Start session cleanup thread
-        self.cleanup_thread = threading.Thread(target=self._session_cleanup_loop, daemon=True)
-        self.cleanup_thread.start()
     
     def _initialize_content(self):
         """Initialize content directory and load PXNT files"""
@@ -419,7 +819,9 @@ class PixnetServer:
             try:
                 filename = os.path.basename(filepath)
                 page_name = os.path.splitext(filename)[0]
-                self.pxnt_files[page_name] = PXNTFile(filepath)
+                pxnt_file = PXNTFile(filepath)
+                pxnt_file.finalize()
+                self.pxnt_files[page_name] = pxnt_file
                 logger.info(f"Loaded page: {page_name}")
             except Exception as e:
                 logger.error(f"Failed to load {filepath}: {str(e)}")
@@ -427,6 +829,7 @@ class PixnetServer:
                     logger.warning("Critical: Failed to load index page")
                     self._create_sample_index()
                     self.pxnt_files["index"] = PXNTFile(os.path.join(self.content_dir, "index.pxnt"))
+                    self.pxnt_files["index"].finalize()
     
     def _create_sample_content(self):
         """Create sample content for demonstration"""
@@ -455,27 +858,21 @@ class PixnetServer:
         width, height = 640, 480
         filepath = os.path.join(self.content_dir, f"{name}.pxnt")
         
-        # Create pixel data (RGBA8)
-        pixels = bytearray(width * height * 4)
-        category_map = bytearray(width * height * 2)
-        
-        # Background gradient
-        for y in range(height):
-            for x in range(width):
-                idx = (y * width + x) * 4
-                if name == "index":
-                    r, g, b = 50, 100 + int((y / height) * 100), 200
-                elif name == "about":
-                    r, g, b = 100 + int((y / height) * 100), 150, 100
-                else:
-                    r, g, b = 150, 100, 150 + int((y / height) * 100)
-                pixels[idx:idx+4] = [r, g, b, 255]
+        # Create pixel data (RGBA8) and category map (little-endian uint16)
+        pixels = np.zeros((height, width, 4), dtype=np.uint8)
+        category_map = np.zeros((height, width), dtype='<u2')
+        
+        # Background gradient, one value per row broadcast across the width
+        ramp = np.arange(height, dtype=np.int32)[:, None] * 100 // height
+        if name == "index":
+            _fill_gradient(pixels, 50, 100 + ramp, 200)
+        elif name == "about":
+            _fill_gradient(pixels, 100 + ramp, 150, 100)
+        else:
+            _fill_gradient(pixels, 150, 100, 150 + ramp)
         
         # Title bar
-        for y in range(60):
-            for x in range(width):
-                idx = (y * width + x) * 4
-                pixels[idx:idx+4] = [30, 30, 60, 255]
+        _fill_rect(pixels, None, 0, 0, width, 60, 0, (30, 30, 60, 255))
         
         # Create elements
         categories = []
@@ -484,18 +881,8 @@ class PixnetServer:
         for element in elements:
             x, y, w, h = element["x"], element["y"], element["w"], element["h"]
             
-            # Draw element
-            for ey in range(h):
-                for ex in range(w):
-                    px, py = x + ex, y + ey
-                    if px < width and py < height:
-                        # Element background
-                        pixel_idx = (py * width + px) * 4
-                        pixels[pixel_idx:pixel_idx+4] = [200, 200, 255, 255]
-                        
-                        # Set category map
-                        cat_idx = (py * width + px) * 2
-                        category_map[cat_idx:cat_idx+2] = struct.pack('<H', category_id)
+            # Draw element background and set category map
+            _fill_rect(pixels, category_map, x, y, w, h, category_id, (200, 200, 255, 255))
             
             # Create behavior data
             behavior_data = self._create_behavior_data(
@@ -515,7 +902,7 @@ class PixnetServer:
             category_id += 1
         
         # Write PXNT file
-        self._write_pxnt_file(filepath, title, width, height, pixels, category_map, categories)
+        self._write_pxnt_file(filepath, title, width, height, pixels.tobytes(), category_map.tobytes(), categories)
         logger.info(f"Created sample page: {name}")
     
     def _create_behavior_data(self, behavior_type: BehaviorType, target: Optional[str] = None, 
@@ -530,84 +917,83 @@ class PixnetServer:
     
     def _create_nav_behavior(self, target: str) -> bytes:
         """Create navigation behavior data"""
-        data = bytearray()
-        data.extend(struct.pack('<B', len(target)))
-        data.extend(target.encode('utf-8'))
-        data.extend(struct.pack('<H', 100))  # Debounce time (ms)
-        return bytes(data)
+        target_bytes = target.encode('utf-8')
+        return _BYTE[len(target_bytes)] + target_bytes + _U16.pack(100)  # Debounce time (ms)
     
     def _create_event_behavior(self, event_name: str) -> bytes:
         """Create event behavior data"""
-        data = bytearray()
-        data.extend(struct.pack('<B', len(event_name)))
-        data.extend(event_name.encode('utf-8'))
-        data.extend(struct.pack('<B', 0))  # Event type (0=click)
-        data.extend(struct.pack('<H', 100))  # Debounce time (ms)
-        return bytes(data)
+        event_bytes = event_name.encode('utf-8')
+        return (_BYTE[len(event_bytes)] + event_bytes +
+                _EVENT_BEHAVIOR_TAIL.pack(0, 100))  # Event type (0=click), debounce time (ms)
     
     def _write_pxnt_file(self, filepath: str, title: str, width: int, height: int,
                         pixels: bytes, category_map: bytes, categories: List[Category]):
         """Write a PXNT file to disk"""
-        with open(filepath, 'wb') as f:
-            # File header
-            header = struct.pack('<4sHHIIIIHHBBH',
-                b'PXNT',           # Magic
-                1,                 # Version
-                0,                 # Flags
-                0,                 # File size (placeholder)
-                int(time.time()),  # Created
-                int(time.time()),  # Modified
-                0,                 # CRC32 (placeholder)
-                width,             # Width
-                height,            # Height
-                0,                 # RGBA8 format
-                0,                 # No compression
-                0                  # Reserved
+        body = bytearray()
+        
+        # Page metadata
+        title_bytes = title.encode('utf-8')
+        body += _U16.pack(len(title_bytes))           # Title length
+        body += title_bytes                           # Title
+        body += _BYTE[0]                              # No author
+        body += _U16.pack(0)                          # No description
+        body += _U16.pack(0)                          # No URL
+        body += _BYTE[0]                              # No keywords
+        body += _BYTE[0]                              # No custom fields
+        
+        # Pixel data
+        body += pixels
+        
+        # Category map
+        body += category_map
+        
+        # Category definitions
+        body += _U16.pack(len(categories))            # Category count
+        for cat in categories:
+            name_bytes = cat.name.encode('utf-8')
+            body += _CATEGORY_HEADER.pack(
+                cat.id,                   # ID
+                cat.behavior_id,          # Behavior ID
+                cat.priority,             # Priority
+                len(name_bytes),          # Name length
+                len(cat.behavior_data)    # Data length
             )
+            body += name_bytes                                    # Name
+            body += cat.behavior_data                             # Behavior data
+        
+        # Checksums and size are known up front, so the header is written once
+        data_crc = zlib.crc32(body)
+        file_size = _PXNT_HEADER.size + len(body) + _PXNT_FOOTER.size
+        now = int(time.time())
+        header = _PXNT_HEADER.pack(
+            b'PXNT',           # Magic
+            1,                 # Version
+            0,                 # Flags
+            file_size,         # File size
+            now,               # Created
+            now,               # Modified
+            data_crc,          # CRC32
+            width,             # Width
+            height,            # Height
+            0,                 # RGBA8 format
+            0,                 # No compression
+            0                  # Reserved
+        )
+        footer = _PXNT_FOOTER.pack(b'TNXP', zlib.crc32(header), data_crc, file_size)
+        
+        with open(filepath, 'wb') as f:
             f.write(header)
-            
-            # Page metadata
-            title_bytes = title.encode('utf-8')
-            f.write(struct.pack('<H', len(title_bytes)))  # Title length
-            f.write(title_bytes)                          # Title
-            f.write(struct.pack('<B', 0))                 # No author
-            f.write(struct.pack('<H', 0))                 # No description
-            f.write(struct.pack('<H', 0))                 # No URL
-            f.write(struct.pack('<B', 0))                 # No keywords
-            f.write(struct.pack('<B', 0))                 # No custom fields
-            
-            # Pixel data
-            f.write(pixels)
-            
-            # Category map
-            f.write(category_map)
-            
-            # Category definitions
-            f.write(struct.pack('<H', len(categories)))   # Category count
-            for cat in categories:
-                name_bytes = cat.name.encode('utf-8')
-                f.write(struct.pack('<H', cat.id))                    # ID
-                f.write(struct.pack('<B', cat.behavior_id))           # Behavior ID
-                f.write(struct.pack('<B', cat.priority))              # Priority
-                f.write(struct.pack('<H', len(name_bytes)))           # Name length
-                f.write(struct.pack('<H', len(cat.behavior_data)))    # Data length
-                f.write(name_bytes)                                   # Name
-                f.write(cat.behavior_data)                            # Behavior data
-            
-            # Footer with file size and CRC32
-            file_size = f.tell()
-            f.seek(6)  # Update file size in header
-            f.write(struct.pack('<I', file_size))
-            f.seek(0, 2)  # Seek to end
-            
-            # Simple footer
-            footer = struct.pack('<4sIII', b'TNXP', 0, 0, 0)
+            f.write(body)
             f.write(footer)
     
     def start(self):
         """Start the server"""
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reuse_port:
+            if not hasattr(socket, 'SO_REUSEPORT'):
+                raise OSError("SO_REUSEPORT is not supported on this platform")
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.server_socket.bind((self.host, self.port))
         self.server_socket.listen(self.max_connections)
         self.running = True
@@ -616,27 +1002,10 @@ class PixnetServer:
         logger.info(f"Available pages: {list(self.pxnt_files.keys())}")
         
         try:
-            while self.running:
-                try:
-                    client_socket, address = self.server_socket.accept()
-                    client_socket.settimeout(10.0)  # Initial handshake timeout
-                    
-                    logger.info(f"New connection from {address[0]}:{address[1]}")
-                    self.stats['connections'] += 1
-                    
-                    thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client_socket, address),
-                        daemon=True
-                    )
-                    thread.start()
-                    
-                except socket.timeout:
-                    continue
-                except OSError as e:
-                    if self.running:
-                        logger.error(f"Accept error: {str(e)}")
-                    continue
+            if self.use_epoll:
+                self._serve_selector()
+            else:
+                self._serve_threaded()
         
         except KeyboardInterrupt:
             logger.info("Server shutting down...")
@@ -645,14 +1014,114 @@ class PixnetServer:
         finally:
             self.stop()
     
+    def _configure_client_socket(self, client_socket: socket.socket):
+        """Tune an accepted socket for small control messages followed by large frames"""
+        try:
+            # Don't let Nagle hold back the ACK or a pong behind the previous write
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Room for a whole compressed page, so a frame rarely needs more than one send
+            if self.send_buffer_size:
+                client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size)
+            if self.recv_buffer_size:
+                client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer_size)
+        except OSError as e:
+            # A connection reset before we got to it must not take down the accept loop
+            logger.warning(f"Could not tune client socket: {str(e)}")
+    
+    def _serve_threaded(self):
+        """Accept loop that hands every connection to its own thread"""
+        self.cleanup_thread = threading.Thread(target=self._session_cleanup_loop, daemon=True)
+        self.cleanup_thread.start()
+        
+        while self.running:
+            try:
+                client_socket, address = self.server_socket.accept()
+                client_socket.settimeout(HANDSHAKE_TIMEOUT)  # Initial handshake timeout
+                self._configure_client_socket(client_socket)
+                
+                logger.info(f"New connection from {address[0]}:{address[1]}")
+                self.stats.local()['connections'] += 1
+                
+                thread = threading.Thread(
+                    target=self._handle_client,
+                    args=(client_socket, address),
+                    daemon=True
+                )
+                thread.start()
+                
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if self.running:
+                    logger.error(f"Accept error: {str(e)}")
+                continue
+    
+    def _serve_selector(self):
+        """Single-threaded event loop multiplexing all connections"""
+        self.selector = selectors.DefaultSelector()
+        self.server_socket.setblocking(False)
+        self.selector.register(self.server_socket, selectors.EVENT_READ)
+        next_deadline = None
+        
+        while self.running:
+            timeout = 1.0
+            if next_deadline is not None:
+                timeout = min(timeout, max(0.0, next_deadline - time.time()))
+            
+            for key, mask in self.selector.select(timeout):
+                if key.data is None:
+                    self._accept_ready()
+                else:
+                    self._service_ready(key.data, mask)
+            
+            next_deadline = self._cleanup_sessions()
+    
+    def _accept_ready(self):
+        """Accept every pending connection and register it with the selector"""
+        while True:
+            try:
+                client_socket, address = self.server_socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                if self.running:
+                    logger.error(f"Accept error: {str(e)}")
+                return
+            
+            client_socket.setblocking(False)
+            self._configure_client_socket(client_socket)
+            
+            logger.info(f"New connection from {address[0]}:{address[1]}")
+            self.stats.local()['connections'] += 1
+            
+            session = self._new_session(client_socket, address)
+            self.selector.register(client_socket, selectors.EVENT_READ, session)
+    
+    def _service_ready(self, session: ClientSession, mask: int):
+        """Handle a readiness event for one client socket"""
+        try:
+            if mask & selectors.EVENT_WRITE:
+                self._flush(session)
+            
+            if mask & selectors.EVENT_READ:
+                nbytes = session.client_socket.recv_into(self._recv_space(session))
+                if not nbytes or not self._process_input(session, nbytes):
+                    self._close_session(session)
+        
+        except (BlockingIOError, InterruptedError):
+            pass
+        except Exception as e:
+            logger.error(f"Error handling client {session.client_address}: {str(e)}")
+            self._close_session(session)
+    
     def stop(self):
         """Stop the server gracefully"""
         self.running = False
         
         # Close all client connections
-        for session in list(self.sessions.values()):
+        for session in self.sessions.values():
             try:
-                self._send_error(session.client_socket, ErrorCode.SERVER_ERROR, "Server shutting down")
+                self._send_error(session, ErrorCode.SERVER_ERROR, "Server shutting down")
                 session.client_socket.close()
             except:
                 pass
@@ -664,119 +1133,314 @@ class PixnetServer:
             except:
                 pass
         
+        if self.selector:
+            self.selector.close()
+            self.selector = None
+        
+        self._expiry_wakeup.set()  # Let the cleanup thread exit
+        
         # Print final statistics
         self._print_stats()
         logger.info("Server stopped")
     
+    def _new_session(self, client_socket: socket.socket, address: Tuple[str, int]) -> ClientSession:
+        """Create the state for a connection that has not completed its handshake"""
+        session = ClientSession(
+            session_id=b'',
+            client_socket=client_socket,
+            client_address=address
+        )
+        session.update_activity()
+        self._schedule_expiry(session)
+        return session
+    
+    def _schedule_expiry(self, session: ClientSession):
+        """Queue a session for the next inactivity check"""
+        with self._expiry_lock:
+            entry = (session.expires_at(), next(self._expiry_order), session)
+            heapq.heappush(self._expiry_heap, entry)
+            session.expiry_queued = True
+            if self._expiry_heap[0] is entry:
+                self._expiry_wakeup.set()  # New earliest deadline
+    
+    def _close_session(self, session: ClientSession):
+        """Forget a session and close its socket"""
+        # Closing under the expiry lock keeps the closed-entry count in step with the heap
+        with self._expiry_lock:
+            if session.closed:
+                return
+            session.closed = True
+            
+            # The entry outlives the connection until its deadline (an expired
+            # session's was already popped), so rebuild once closed entries dominate
+            if session.expiry_queued:
+                self._expiry_closed += 1
+                if self._expiry_closed * 2 > len(self._expiry_heap):
+                    live = []
+                    for entry in self._expiry_heap:
+                        if entry[2].closed:
+                            entry[2].expiry_queued = False
+                        else:
+                            live.append(entry)
+                    self._expiry_heap = live
+                    heapq.heapify(self._expiry_heap)
+                    self._expiry_closed = 0
+        
+        if self.selector:
+            try:
+                self.selector.unregister(session.client_socket)
+            except (KeyError, ValueError):
+                pass  # Already unregistered
+        
+        self.sessions.remove(session.session_id)
+        try:
+            session.client_socket.close()
+        except OSError:
+            pass
+        
+        # Let the buffers go now rather than when the heap lets go of the session
+        session.recv_buf = session.recv_view = None
+        session.outbox.clear()
+        session.input_values.clear()
+        
+        logger.info(f"Client disconnected: {session.client_address}")
+    
     def _handle_client(self, client_socket: socket.socket, address: Tuple[str, int]):
         """Handle a client connection"""
-        session = None
+        session = self._new_session(client_socket, address)
         
         try:
-            # Handle handshake
-            session = self._handle_handshake(client_socket, address)
-            if not session:
-                return
-            
-            # Send initial page
-            self._send_page(session, "index")
-            
-            # Main client loop
             while self.running and session.is_active():
                 try:
-                    # Read message header
-                    magic = client_socket.recv(6)
-                    if not magic:
+                    nbytes = client_socket.recv_into(self._recv_space(session))
+                    if not nbytes:
                         break  # Connection closed
                     
-                    if len(magic) != 6:
-                        logger.warning(f"Invalid message header from {address}")
-                        break
-                    
-                    session.update_activity()
-                    
-                    # Handle different message types
-                    if magic == MAGIC_EVENT:
-                        self._handle_event(session)
-                    elif magic == MAGIC_INPUT:
-                        self._handle_input(session)
-                    elif magic == MAGIC_PING:
-                        self._handle_ping(session)
-                    elif magic == MAGIC_BYE:
-                        logger.info(f"Client {address} requested disconnect")
-                        break
-                    else:
-                        logger.warning(f"Unknown message type: {magic.hex()} from {address}")
+                    if not self._process_input(session, nbytes):
                         break
                 
                 except socket.timeout:
+                    if not session.handshake_done:
+                        logger.warning(f"Handshake timeout from {address}")
+                        break
                     continue
                 except Exception as e:
-                    logger.error(f"Error handling client {address}: {str(e)}")
+                    if not session.closed:  # Not expired by the cleanup thread
+                        logger.error(f"Error handling client {address}: {str(e)}")
                     break
         
         except Exception as e:
             logger.error(f"Client handler error for {address}: {str(e)}")
         finally:
-            if session and session.session_id in self.sessions:
-                del self.sessions[session.session_id]
-            client_socket.close()
-            logger.info(f"Client disconnected: {address}")
+            self._close_session(session)
+            self.stats.retire()  # This thread ends with the connection
     
-    def _handle_handshake(self, client_socket: socket.socket, address: Tuple[str, int]) -> Optional[ClientSession]:
+    def _recv_space(self, session: ClientSession) -> memoryview:
+        """Free tail of the session's receive buffer, compacting or growing it when full"""
+        buf = session.recv_buf
+        if session.recv_end == len(buf):
+            pending = session.recv_end - session.recv_start
+            if session.recv_start:
+                # Move the partial message to the front (same length, so no resize)
+                buf[:pending] = buf[session.recv_start:session.recv_end]
+            else:
+                # A single message larger than the buffer
+                grown = bytearray(len(buf) * 2)
+                grown[:pending] = buf
+                session.recv_buf = grown
+                session.recv_view = memoryview(grown)
+            session.recv_start, session.recv_end = 0, pending
+        
+        return session.recv_view[session.recv_end:]
+    
+    def _process_input(self, session: ClientSession, nbytes: int) -> bool:
+        """Dispatch every complete message after nbytes were received into the buffer.
+        
+        Returns False when the connection should be closed.
+        """
+        self.stats.local()['bytes_received'] += nbytes
+        session.recv_end += nbytes
+        view = session.recv_view
+        
+        off = session.recv_start
+        try:
+            while True:
+                size = self._message_size(session, off)
+                if size is None or session.recv_end - off < size:
+                    return True  # Wait for the rest of the message
+                
+                # Handlers get a view into the buffer and copy out what they keep
+                message = view[off:off+size]
+                off += size
+                if not self._dispatch_message(session, message):
+                    return False
+        finally:
+            if off == session.recv_end:
+                session.recv_start = session.recv_end = 0
+            else:
+                session.recv_start = off
+    
+    def _message_size(self, session: ClientSession, off: int) -> Optional[int]:
+        """Total length of the message starting at off, or None until it can be told.
+        
+        Handlers only ever see complete messages, so they never wait on
+        or retry partial reads.
+        """
+        buf = session.recv_buf
+        avail = session.recv_end - off
+        
+        if not session.handshake_done:
+            # Clients pad the user agent past its declared length and wait for
+            # the ACK before sending more, so the handshake is all that arrived
+            return avail if avail >= 10 else None
+        
+        if avail < 6:
+            return None
+        
+        magic = session.recv_view[off:off+6]
+        if magic == MAGIC_EVENT:
+            # Magic, 23-byte header, name length, name, mouse position
+            return 34 + buf[off+29] if avail >= 30 else None
+        elif magic == MAGIC_INPUT:
+            # Magic, 18-byte header ending in the payload length, payload
+            return 24 + _BE_U16.unpack_from(buf, off + 22)[0] if avail >= 24 else None
+        elif magic == MAGIC_PING:
+            return 22  # Magic, session ID, timestamp
+        
+        return 6  # Bye and unknown messages are handled on their magic alone
+    
+    def _dispatch_message(self, session: ClientSession, message: memoryview) -> bool:
+        """Handle one complete client message. Returns False to close the connection"""
+        if not session.handshake_done:
+            if not self._handle_handshake(session, message):
+                return False
+            
+            # Send initial page
+            self._send_page(session, "index")
+            return True
+        
+        session.update_activity()
+        
+        # Handle different message types
+        magic = message[:6]
+        if magic == MAGIC_EVENT:
+            return self._handle_event(session, message)
+        elif magic == MAGIC_INPUT:
+            return self._handle_input(session, message)
+        elif magic == MAGIC_PING:
+            return self._handle_ping(session, message)
+        elif magic == MAGIC_BYE:
+            logger.info(f"Client {session.client_address} requested disconnect")
+            return False
+        else:
+            logger.warning(f"Unknown message type: {magic.hex()} from {session.client_address}")
+            return False
+    
+    def _send(self, session: ClientSession, *chunks: Union[bytes, memoryview], cork: bool = False):
+        """Send chunks to a client, queueing whatever the socket cannot take yet.
+        
+        With cork, the chunks leave as full segments rather than one short
+        packet per partial write, until everything queued has been written.
+        """
+        if cork:
+            self._set_cork(session, True)
+        
+        if not _HAS_SENDMSG and len(chunks) > 1:
+            chunks = (b''.join(chunks),)  # One send() per frame without scatter/gather
+        
+        if self.selector is None:
+            pending = deque(_as_view(chunk) for chunk in chunks)
+            try:
+                while pending:
+                    _drop_sent(pending, _write_some(session.client_socket, pending))
+            finally:
+                self._set_cork(session, False)
+            return
+        
+        session.outbox.extend(_as_view(chunk) for chunk in chunks)
+        self._flush(session)
+    
+    def _set_cork(self, session: ClientSession, corked: bool):
+        """Toggle TCP_CORK where the platform has it"""
+        if _TCP_CORK is None or session.corked == corked:
+            return
+        try:
+            session.client_socket.setsockopt(socket.IPPROTO_TCP, _TCP_CORK, int(corked))
+            session.corked = corked
+        except OSError:
+            pass  # The next send reports a dead socket
+    
+    def _flush(self, session: ClientSession):
+        """Write queued output until the socket would block"""
+        outbox = session.outbox
+        try:
+            while outbox:
+                _drop_sent(outbox, _write_some(session.client_socket, outbox))
+        except (BlockingIOError, InterruptedError):
+            pass
+        
+        if not outbox:
+            self._set_cork(session, False)  # Push out the tail of the frame
+        
+        # Only ask for write readiness while there is something left to send
+        events = selectors.EVENT_READ | selectors.EVENT_WRITE if outbox else selectors.EVENT_READ
+        if self.selector.get_key(session.client_socket).events != events:
+            self.selector.modify(session.client_socket, events, session)
+    
+    def _handle_handshake(self, session: ClientSession, data: memoryview) -> bool:
         """Handle client handshake"""
+        address = session.client_address
         try:
             # Read handshake
-            data = client_socket.recv(1024)
             if len(data) < 10:
-                self._send_error(client_socket, ErrorCode.PROTOCOL_ERROR, "Invalid handshake")
-                return None
+                self._send_error(session, ErrorCode.PROTOCOL_ERROR, "Invalid handshake")
+                return False
             
             magic = data[:6]
             if magic != MAGIC_HANDSHAKE:
-                self._send_error(client_socket, ErrorCode.PROTOCOL_ERROR, "Invalid handshake magic")
-                return None
+                self._send_error(session, ErrorCode.PROTOCOL_ERROR, "Invalid handshake magic")
+                return False
             
             version = data[6]
             if version != PROTOCOL_VERSION:
-                self._send_error(client_socket, ErrorCode.UNSUPPORTED_VERSION, f"Unsupported version: {version}")
-                return None
+                self._send_error(session, ErrorCode.UNSUPPORTED_VERSION, f"Unsupported version: {version}")
+                return False
             
-            capabilities = struct.unpack('>H', data[7:9])[0]
+            capabilities = _BE_U16.unpack_from(data, 7)[0]
             user_agent_len = data[9]
-            user_agent = data[10:10+user_agent_len].decode('ascii', errors='ignore')
+            user_agent = str(data[10:10+user_agent_len], 'ascii', errors='ignore')
             
             logger.info(f"Handshake from {address}: version={version}, capabilities={capabilities}, user-agent={user_agent}")
             
             # Generate session ID
-            session_id = secrets.token_bytes(8)
+            session_id = self.session_ids.next()
             
             # Send acknowledgment
-            response = MAGIC_ACK
-            response += struct.pack('B', PROTOCOL_VERSION)  # Version
-            response += session_id  # Session ID
-            response += struct.pack('>H', 0x01)  # Server capabilities (compression)
+            response = _HANDSHAKE_ACK.pack(
+                MAGIC_ACK,
+                PROTOCOL_VERSION,     # Version
+                session_id,           # Session ID
+                SERVER_CAPABILITIES   # Server capabilities
+            )
             
-            client_socket.send(response)
+            self._send(session, response)
             
-            # Create and store session
-            session = ClientSession(
-                session_id=session_id,
-                client_socket=client_socket,
-                client_address=address,
-                user_agent=user_agent
-            )
-            self.sessions[session_id] = session
+            # Store session
+            session.session_id = session_id
+            session.user_agent = user_agent
+            session.capabilities = capabilities
+            session.handshake_done = True
+            self.sessions.add(session)
             
-            return session
+            return True
             
         except Exception as e:
             logger.error(f"Handshake error with {address}: {str(e)}")
             try:
-                self._send_error(client_socket, ErrorCode.PROTOCOL_ERROR, "Handshake failed")
+                self._send_error(session, ErrorCode.PROTOCOL_ERROR, "Handshake failed")
             except:
                 pass
-            return None
+            return False
     
     def _send_page(self, session: ClientSession, page_name: str):
         """Send a PXNT page to the client"""
@@ -786,50 +1450,29 @@ class PixnetServer:
         
         pxnt_file = self.pxnt_files[page_name]
         
-        # Create frame header
-        header = MAGIC_PIXNET
-        header += struct.pack('B', FrameType.FULL)  # Frame type
-        header += struct.pack('>I', session.sequence)  # Sequence
-        header += struct.pack('>Q', int(time.time() * 1000000))  # Timestamp
-        header += struct.pack('>H', 0x01)  # Flags (compression enabled)
-        header += struct.pack('B', PROTOCOL_VERSION)  # Version
-        header += struct.pack('>H', pxnt_file.header['width'])  # Width
-        header += struct.pack('>H', pxnt_file.header['height'])  # Height
-        header += struct.pack('B', 0)  # Format (RGBA8)
+        # Pick the cached pixel payload, LZ4 when both ends support it
+        if pxnt_file.compressed_pixels_lz4 is not None and session.capabilities & CAP_LZ4:
+            compressed_pixels = pxnt_file.compressed_pixels_lz4_view
+            header = bytearray(pxnt_file.frame_header_template_lz4)
+        else:
+            compressed_pixels = pxnt_file.compressed_pixels_view
+            header = bytearray(pxnt_file.frame_header_template)
         
-        # Compress pixel data
-        compressed_pixels = zlib.compress(pxnt_file.pixels)
+        # Patch the per-send fields into the cached frame header
+        _FRAME_SEQ_TS.pack_into(header, _FRAME_SEQ_OFFSET, session.sequence, time.time_ns() // 1000)
         
-        # Calculate checksum (simplified)
-        checksum = len(compressed_pixels) + len(pxnt_file.category_map)
-        header += struct.pack('>I', checksum)
-        
-        # Serialize categories
-        category_data = bytearray()
-        category_data.extend(struct.pack('>H', len(pxnt_file.categories)))  # Category count
-        
-        for category in pxnt_file.categories:
-            name_bytes = category.name.encode('ascii')
-            cat_data = struct.pack('>H', category.id)  # ID
-            cat_data += struct.pack('B', len(name_bytes))  # Name length
-            cat_data += name_bytes  # Name
-            cat_data += struct.pack('B', category.behavior_id)  # Behavior ID
-            cat_data += struct.pack('B', category.priority)  # Priority
-            cat_data += struct.pack('>H', len(category.behavior_data))  # Behavior data length
-            cat_data += category.behavior_data  # Behavior data
-            category_data.extend(cat_data)
+        category_map = pxnt_file.category_map_view
+        category_data = pxnt_file.category_data_view
         
         # Send frame
         try:
-            session.client_socket.send(header)
-            session.client_socket.send(compressed_pixels)
-            session.client_socket.send(pxnt_file.category_map)
-            session.client_socket.send(category_data)
+            self._send(session, header, compressed_pixels, category_map, category_data, cork=True)
             
             session.sequence += 1
             session.current_page = page_name
-            self.stats['pages_served'] += 1
-            self.stats['bytes_sent'] += len(header) + len(compressed_pixels) + len(pxnt_file.category_map) + len(category_data)
+            stats = self.stats.local()
+            stats['pages_served'] += 1
+            stats['bytes_sent'] += len(header) + len(compressed_pixels) + len(category_map) + len(category_data)
             
             logger.debug(f"Sent page '{page_name}' to {session.client_address}")
             
@@ -837,39 +1480,20 @@ class PixnetServer:
             logger.error(f"Error sending page to {session.client_address}: {str(e)}")
             raise
     
-    def _handle_event(self, session: ClientSession):
-        """Handle an event message from client"""
+    def _handle_event(self, session: ClientSession, message: memoryview) -> bool:
+        """Handle an event message from client. Returns False on a protocol violation"""
         try:
-            # Read event header (after magic)
-            header = session.client_socket.recv(23)
-            if len(header) < 23:
-                raise ValueError("Incomplete event header")
-            
-            session_id = header[:8]
+            # Event header (after magic); framing guarantees the whole message is here
+            session_id, sequence, zone_id, event_type, timestamp = _EVENT_HEADER.unpack_from(message, 6)
             if session_id != session.session_id:
-                raise ValueError("Invalid session ID")
-            
-            sequence = struct.unpack('>I', header[8:12])[0]
-            zone_id = struct.unpack('>H', header[12:14])[0]
-            event_type = header[14]
-            timestamp = struct.unpack('>Q', header[15:23])[0]
-            
-            # Read event name length
-            name_len_data = session.client_socket.recv(1)
-            if len(name_len_data) != 1:
-                raise ValueError("Missing event name length")
-            
-            name_len = name_len_data[0]
+                return self._reject(session, "event", "Invalid session ID")
             
-            # Read event name
-            event_name = session.client_socket.recv(name_len).decode('ascii', errors='ignore')
+            # Event name
+            name_len = message[29]
+            event_name = str(message[30:30+name_len], 'ascii', errors='ignore')
             
-            # Read mouse position (optional)
-            mouse_data = session.client_socket.recv(4)
-            if len(mouse_data) == 4:
-                mouse_x, mouse_y = struct.unpack('>HH', mouse_data)
-            else:
-                mouse_x, mouse_y = 0, 0
+            # Mouse position
+            mouse_x, mouse_y = _MOUSE_POS.unpack_from(message, 30 + name_len)
             
             logger.debug(f"Event from {session.client_address}: {event_name} (zone {zone_id}) at ({mouse_x}, {mouse_y})")
             
@@ -882,117 +1506,123 @@ class PixnetServer:
                 else:
                     logger.warning(f"Invalid navigation target from {session.client_address}: {target_page}")
             
-            # Update activity
-            session.update_activity()
+            return True
             
         except Exception as e:
             logger.error(f"Error handling event from {session.client_address}: {str(e)}")
-            self.stats['errors'] += 1
+            self.stats.local()['errors'] += 1
             raise
     
-    def _handle_input(self, session: ClientSession):
-        """Handle an input message from client"""
+    def _handle_input(self, session: ClientSession, message: memoryview) -> bool:
+        """Handle an input message from client. Returns False on a protocol violation"""
         try:
-            # Read input header (after magic)
-            header = session.client_socket.recv(18)
-            if len(header) < 18:
-                raise ValueError("Incomplete input header")
-            
-            session_id = header[:8]
+            # Input header (after magic); framing guarantees the whole message is here
+            (session_id, sequence, zone_id, input_type,
+             validation_status, payload_length) = _INPUT_HEADER.unpack_from(message, 6)
             if session_id != session.session_id:
-                raise ValueError("Invalid session ID")
+                return self._reject(session, "input", "Invalid session ID")
             
-            sequence = struct.unpack('>I', header[8:12])[0]
-            zone_id = struct.unpack('>H', header[12:14])[0]
-            input_type = header[14]
-            validation_status = header[15]
-            payload_length = struct.unpack('>H', header[16:18])[0]
-            
-            # Read payload
-            payload = session.client_socket.recv(payload_length).decode('utf-8', errors='ignore')
+            # Payload
+            payload = str(message[24:24+payload_length], 'utf-8', errors='ignore')
             
             # Store input value
             session.input_values[zone_id] = payload
-            session.update_activity()
             
             logger.debug(f"Input from {session.client_address}: zone {zone_id} = '{payload}'")
+            return True
             
         except Exception as e:
             logger.error(f"Error handling input from {session.client_address}: {str(e)}")
-            self.stats['errors'] += 1
+            self.stats.local()['errors'] += 1
             raise
     
-    def _handle_ping(self, session: ClientSession):
-        """Handle a ping message from client"""
+    def _handle_ping(self, session: ClientSession, message: memoryview) -> bool:
+        """Handle a ping message from client. Returns False on a protocol violation"""
         try:
-            # Read ping data (after magic)
-            ping_data = session.client_socket.recv(16)
-            if len(ping_data) < 16:
-                raise ValueError("Incomplete ping data")
+            # Ping data (after magic); framing guarantees all 16 bytes are here
+            ping_data = message[6:22]
+            if ping_data[:8] != session.session_id:
+                return self._reject(session, "ping", "Invalid session ID")
             
-            session_id = ping_data[:8]
-            timestamp = ping_data[8:16]
-            
-            if session_id != session.session_id:
-                raise ValueError("Invalid session ID")
-            
-            # Send pong response
-            pong = MAGIC_PONG + session_id + timestamp
-            session.client_socket.send(pong)
-            session.update_activity()
+            # Pong echoes the session ID and timestamp, which sit contiguously in the ping
+            self._send(session, MAGIC_PONG + ping_data)
             
             logger.debug(f"Ping from {session.client_address}")
+            return True
             
         except Exception as e:
             logger.error(f"Error handling ping from {session.client_address}: {str(e)}")
-            self.stats['errors'] += 1
+            self.stats.local()['errors'] += 1
             raise
     
-    def _send_error(self, client_socket: socket.socket, error_code: ErrorCode, message: str):
-        """Send an error message to client"""
+    def _reject(self, session: ClientSession, kind: str, reason: str) -> bool:
+        """Log and count a malformed message; callers return the result to close the connection"""
+        logger.error(f"Error handling {kind} from {session.client_address}: {reason}")
+        self.stats.local()['errors'] += 1
+        return False
+    
+    def _send_error(self, session: ClientSession, error_code: ErrorCode, message: str):
+        """Send an error message to client, queued behind any output still pending"""
         try:
             message_bytes = message.encode('utf-8')
-            error_msg = MAGIC_ERROR
-            error_msg += struct.pack('>H', error_code)
-            error_msg += struct.pack('>H', len(message_bytes))
-            error_msg += message_bytes
+            error_msg = _ERROR_HEADER.pack(MAGIC_ERROR, error_code, len(message_bytes)) + message_bytes
             
-            client_socket.send(error_msg)
-            self.stats['errors'] += 1
+            self._send(session, error_msg)
+            self.stats.local()['errors'] += 1
         except:
             pass
     
     def _session_cleanup_loop(self):
         """Background thread to clean up inactive sessions"""
         while self.running:
-            time.sleep(60)  # Run once per minute
-            self._cleanup_sessions()
+            self._expiry_wakeup.clear()
+            next_deadline = self._cleanup_sessions()
+            delay = MAX_SESSION_AGE if next_deadline is None else next_deadline - time.time()
+            self._expiry_wakeup.wait(max(0.1, delay))
     
-    def _cleanup_sessions(self):
-        """Clean up inactive sessions"""
-        inactive_sessions = [
-            session_id for session_id, session in self.sessions.items()
-            if not session.is_active()
-        ]
+    def _cleanup_sessions(self) -> Optional[float]:
+        """Clean up inactive sessions, returning the next expiry deadline if any"""
+        now = time.time()
+        expired = []
         
-        for session_id in inactive_sessions:
+        with self._expiry_lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now:
+                _, _, session = heapq.heappop(heap)
+                if session.closed:
+                    session.expiry_queued = False
+                    self._expiry_closed -= 1
+                    continue
+                
+                # Activity since the entry was queued just moves the deadline
+                deadline = session.expires_at()
+                if deadline > now:
+                    heapq.heappush(heap, (deadline, next(self._expiry_order), session))
+                else:
+                    session.expiry_queued = False  # Popped; its close must not be counted
+                    expired.append(session)
+            
+            next_deadline = heap[0][0] if heap else None
+        
+        for session in expired:
             try:
-                session = self.sessions[session_id]
                 logger.info(f"Cleaning up inactive session from {session.client_address}")
-                session.client_socket.close()
-                del self.sessions[session_id]
+                self._close_session(session)
             except:
                 pass
+        
+        return next_deadline
     
     def _print_stats(self):
         """Print server statistics"""
         logger.info("\nServer Statistics:")
         logger.info(f"Active sessions: {len(self.sessions)}")
-        logger.info(f"Total connections: {self.stats['connections']}")
-        logger.info(f"Pages served: {self.stats['pages_served']}")
-        logger.info(f"Errors encountered: {self.stats['errors']}")
-        logger.info(f"Bytes sent: {self.stats['bytes_sent']}")
-        logger.info(f"Bytes received: {self.stats['bytes_received']}")
+        stats = self.stats.totals()
+        logger.info(f"Total connections: {stats['connections']}")
+        logger.info(f"Pages served: {stats['pages_served']}")
+        logger.info(f"Errors encountered: {stats['errors']}")
+        logger.info(f"Bytes sent: {stats['bytes_sent']}")
+        logger.info(f"Bytes received: {stats['bytes_received']}")
 
 def main():
     """Main entry point for the PIXNET server"""
@@ -1008,6 +1638,14 @@ def main():
                        help='Directory containing PXNT files')
     parser.add_argument('--max-conn', type=int, default=100,
                        help='Maximum simultaneous connections')
+    parser.add_argument('--sndbuf', type=int, default=SEND_BUFFER_SIZE,
+                       help='SO_SNDBUF for client sockets in bytes (0 = OS default)')
+    parser.add_argument('--rcvbuf', type=int, default=0,
+                       help='SO_RCVBUF for client sockets in bytes (0 = OS default)')
+    parser.add_argument('--threaded', action='store_true',
+                       help='Use one thread per client instead of the selector event loop')
+    parser.add_argument('--reuse-port', action='store_true',
+                       help='Set SO_REUSEPORT so several server processes can share the port')
     
     args = parser.parse_args()
     
@@ -1016,7 +1654,11 @@ def main():
             host=args.host,
             port=args.port,
             content_dir=args.content,
-            max_connections=args.max_conn
+            max_connections=args.max_conn,
+            use_epoll=USE_EPOLL_DEFAULT and not args.threaded,
+            reuse_port=args.reuse_port,
+            send_buffer_size=args.sndbuf,
+            recv_buffer_size=args.rcvbuf
         )
         server.start()
     except Exception as e:
@@ -1026,5 +1668,4 @@ def main():
     return 0
 
 if __name__ == "__main__":
-    import sys
     sys.exit(main())
\ No newline at end of file